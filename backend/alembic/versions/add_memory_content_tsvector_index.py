@@ -0,0 +1,27 @@
+"""add full-text index on memory content
+
+Revision ID: add_memory_content_tsvector_index
+Revises: add_memory_trigram_indexes
+Create Date: 2026-10-17 19:30:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_memory_content_tsvector_index'
+down_revision = 'add_memory_trigram_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # hybrid_search matches to_tsvector('simple', content) @@ plainto_tsquery(...);
+    # an expression index keeps the model free of a Postgres-only column
+    op.execute("""
+        CREATE INDEX idx_memories_content_tsv ON memories
+        USING gin (to_tsvector('simple', content))
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_memories_content_tsv', table_name='memories')
@@ -0,0 +1,47 @@
+"""add trigram indexes for memory keyword search
+
+Revision ID: add_memory_trigram_indexes
+Revises: memory_embedding_vector_hnsw
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_memory_trigram_indexes'
+down_revision = 'memory_embedding_vector_hnsw'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # search_memories filters with ILIKE '%term%' on the content and on the
+    # metadata cast to text; trigram GIN indexes serve both without a seq scan.
+    # The metadata expression must match SQLAlchemy's CAST(... AS VARCHAR).
+    op.create_index(
+        'idx_memories_content_trgm',
+        'memories',
+        ['content'],
+        postgresql_using='gin',
+        postgresql_ops={'content': 'gin_trgm_ops'}
+    )
+    op.execute("""
+        CREATE INDEX idx_memories_meta_data_trgm ON memories
+        USING gin ((CAST(meta_data AS VARCHAR)) gin_trgm_ops)
+    """)
+
+    # Per-user listings and the no-query search path read newest first
+    op.create_index(
+        'idx_memories_user_created_at',
+        'memories',
+        ['user_id', sa.text('created_at DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_memories_user_created_at', table_name='memories')
+    op.drop_index('idx_memories_meta_data_trgm', table_name='memories')
+    op.drop_index('idx_memories_content_trgm', table_name='memories')
@@ -0,0 +1,26 @@
+"""add last_analysis_fingerprint to cognitive_profiles
+
+Revision ID: add_profile_analysis_fingerprint
+Revises: add_user_keyword_hits
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_profile_analysis_fingerprint'
+down_revision = 'add_user_keyword_hits'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'cognitive_profiles',
+        sa.Column('last_analysis_fingerprint', sa.LargeBinary(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('cognitive_profiles', 'last_analysis_fingerprint')
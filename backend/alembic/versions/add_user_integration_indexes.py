@@ -0,0 +1,30 @@
+"""add index for integration lookups on users
+
+Revision ID: add_user_integration_indexes
+Revises: add_integrations_data
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_integration_indexes'
+down_revision = 'add_integrations_data'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # integrations_data is a json (not jsonb) column, so GIN is not available;
+    # index the extracted Todoist connection flag instead
+    op.create_index(
+        'ix_users_todoist_connected',
+        'users',
+        [sa.text("(integrations_data -> 'todoist' ->> 'connected')")],
+        postgresql_where=sa.text("integrations_data -> 'todoist' IS NOT NULL")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_todoist_connected', table_name='users')
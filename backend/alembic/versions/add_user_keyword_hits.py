@@ -0,0 +1,110 @@
+"""add user_keyword_hits maintained by a trigger on memories
+
+Revision ID: add_user_keyword_hits
+Revises: user_timestamps_server_default
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_keyword_hits'
+down_revision = 'user_timestamps_server_default'
+branch_labels = None
+depends_on = None
+
+# Keywords of the database-counted groups (interest, work_style, task) in
+# app/services/cognitive_profile_service.py; keep the two lists in sync. The
+# service compares the seeded rows with DB_KEYWORD_TAGS and counts keywords
+# itself when they differ
+PROFILE_KEYWORDS = [
+    "aesthetic", "alone", "analyze", "app", "art", "brainstorm", "calculate",
+    "client", "code", "collaborate", "communicate", "community", "computer",
+    "cook", "course", "create", "creative", "cuisine", "data", "design",
+    "destination", "digital", "discover", "discuss", "doctor", "document", "draw",
+    "eat", "education", "evaluate", "exercise", "experiment", "explore", "family",
+    "fitness", "friend", "game", "health", "hypothesis", "imagine", "independent",
+    "innovate", "journey", "knowledge", "learn", "manage", "market", "match",
+    "meal", "measure", "medical", "meet", "meeting", "music", "myself", "network",
+    "nutrition", "organize", "own", "paint", "party", "play", "present",
+    "programming", "project", "recipe", "relationship", "report", "research",
+    "restaurant", "revenue", "schedule", "social", "software", "solo", "sport",
+    "strategy", "study", "taste", "teach", "team", "tech", "together", "travel",
+    "trip", "visit", "we", "wellness"
+]
+
+# Whole-word occurrences of :keyword in :content, as the service counts them
+OCCURRENCES = r"array_length(regexp_split_to_array(lower({content}), '\m' || {keyword} || '\M'), 1) - 1"
+
+
+def upgrade() -> None:
+    op.create_table('profile_keywords',
+        sa.Column('keyword', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('keyword')
+    )
+    op.bulk_insert(
+        sa.table('profile_keywords', sa.column('keyword', sa.String())),
+        [{'keyword': keyword} for keyword in PROFILE_KEYWORDS]
+    )
+    
+    op.create_table('user_keyword_hits',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('keyword', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'keyword')
+    )
+    
+    # Backfill from existing memories
+    op.execute(f"""
+        INSERT INTO user_keyword_hits (user_id, keyword, count)
+        SELECT m.user_id, k.keyword, sum({OCCURRENCES.format(content='m.content', keyword='k.keyword')})
+        FROM memories m CROSS JOIN profile_keywords k
+        GROUP BY m.user_id, k.keyword
+        HAVING sum({OCCURRENCES.format(content='m.content', keyword='k.keyword')}) > 0
+    """)
+    
+    # Keep the counts current: subtract the old row's hits, add the new row's
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION update_user_keyword_hits() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE user_keyword_hits h
+                SET count = h.count - old_hits.hits
+                FROM (
+                    SELECT k.keyword, {OCCURRENCES.format(content='OLD.content', keyword='k.keyword')} AS hits
+                    FROM profile_keywords k
+                ) old_hits
+                WHERE h.user_id = OLD.user_id
+                  AND h.keyword = old_hits.keyword
+                  AND old_hits.hits > 0;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO user_keyword_hits (user_id, keyword, count)
+                SELECT NEW.user_id, new_hits.keyword, new_hits.hits
+                FROM (
+                    SELECT k.keyword, {OCCURRENCES.format(content='NEW.content', keyword='k.keyword')} AS hits
+                    FROM profile_keywords k
+                ) new_hits
+                WHERE new_hits.hits > 0
+                ON CONFLICT (user_id, keyword)
+                DO UPDATE SET count = user_keyword_hits.count + EXCLUDED.count;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER memories_keyword_hits
+        AFTER INSERT OR UPDATE OF content, user_id OR DELETE ON memories
+        FOR EACH ROW EXECUTE FUNCTION update_user_keyword_hits()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS memories_keyword_hits ON memories")
+    op.execute("DROP FUNCTION IF EXISTS update_user_keyword_hits()")
+    op.drop_table('user_keyword_hits')
+    op.drop_table('profile_keywords')
@@ -0,0 +1,45 @@
+"""store memory embeddings as pgvector with an HNSW index
+
+Revision ID: memory_embedding_vector_hnsw
+Revises: normalize_memory_embeddings
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'memory_embedding_vector_hnsw'
+down_revision = 'normalize_memory_embeddings'
+branch_labels = None
+depends_on = None
+
+# all-MiniLM-L6-v2 output size (core.models.memory.EMBEDDING_DIMENSION)
+EMBEDDING_DIMENSION = 384
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+
+    # JSON arrays print as '[x, y, ...]', which is also pgvector's input format;
+    # JSON nulls and non-arrays become SQL NULL
+    op.execute(f"""
+        ALTER TABLE memories
+        ALTER COLUMN embedding TYPE vector({EMBEDDING_DIMENSION})
+        USING CASE WHEN json_typeof(embedding) = 'array' THEN embedding::text::vector END
+    """)
+
+    # Approximate k-NN for semantic_search (HNSW needs pgvector >= 0.5)
+    op.execute("""
+        CREATE INDEX memory_embedding_hnsw ON memories
+        USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS memory_embedding_hnsw')
+    op.execute("""
+        ALTER TABLE memories
+        ALTER COLUMN embedding TYPE json
+        USING embedding::text::json
+    """)
@@ -0,0 +1,46 @@
+"""L2-normalize stored memory embeddings
+
+Revision ID: normalize_memory_embeddings
+Revises: add_profile_analysis_fingerprint
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'normalize_memory_embeddings'
+down_revision = 'add_profile_analysis_fingerprint'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # EmbeddingService now writes unit-norm vectors and scores them with a plain
+    # dot product; rescale the rows written before that. Zero vectors are kept.
+    op.execute("""
+        UPDATE memories AS m
+        SET embedding = n.normalized
+        FROM (
+            SELECT memories.id,
+                   json_agg(e.value::float8 / norms.norm ORDER BY e.ord) AS normalized
+            FROM memories
+            CROSS JOIN LATERAL (
+                SELECT sqrt(sum(x::float8 ^ 2)) AS norm
+                FROM json_array_elements_text(
+                    CASE WHEN json_typeof(memories.embedding) = 'array' THEN memories.embedding END
+                ) AS x
+            ) AS norms
+            CROSS JOIN LATERAL json_array_elements_text(
+                CASE WHEN json_typeof(memories.embedding) = 'array' THEN memories.embedding END
+            ) WITH ORDINALITY AS e(value, ord)
+            WHERE norms.norm > 0
+            GROUP BY memories.id
+        ) AS n
+        WHERE m.id = n.id
+    """)
+
+
+def downgrade() -> None:
+    # Cosine similarity is unchanged by rescaling, so there is nothing to undo
+    pass
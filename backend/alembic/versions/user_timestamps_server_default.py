@@ -0,0 +1,34 @@
+"""set users timestamps server-side
+
+Revision ID: user_timestamps_server_default
+Revises: add_user_integration_indexes
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'user_timestamps_server_default'
+down_revision = 'add_user_integration_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Backfill any NULLs before tightening the columns
+    op.execute("UPDATE users SET created_at = timezone('utc', now()) WHERE created_at IS NULL")
+    op.execute("UPDATE users SET updated_at = created_at WHERE updated_at IS NULL")
+    
+    for column in ('created_at', 'updated_at'):
+        op.alter_column(
+            'users',
+            column,
+            server_default=sa.text("timezone('utc', now())"),
+            nullable=False
+        )
+
+
+def downgrade() -> None:
+    for column in ('created_at', 'updated_at'):
+        op.alter_column('users', column, server_default=None, nullable=True)
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import datetime, timedelta
 from typing import Optional
 import os
+import asyncio
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+import uuid
 
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from core.database import get_db
+from core.models.user import User
 from core.schemas.auth import UserCreate, UserResponse, Token
 
 router = APIRouter()
@@ -27,6 +35,12 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
+async def run_cpu_bound(request: Request, func, *args):
+    """Run CPU-heavy work (bcrypt) in the app's process pool, off the event loop"""
+    pool = getattr(request.app.state, "cpu_pool", None)
+    return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -55,42 +69,100 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     return {"user_id": user_id}  # Temporary return
 
 
+async def get_current_user_id(current_user: dict = Depends(get_current_user)) -> uuid.UUID:
+    """Current user's id parsed once as a UUID (get_current_user is cached per request)"""
+    try:
+        return uuid.UUID(current_user["user_id"])
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 @router.post("/register", response_model=UserResponse)
-async def register(user: UserCreate):
+async def register(
+    user: UserCreate,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
     """Register a new user"""
-    # TODO: Check if user exists
-    # TODO: Create user in database
-    hashed_password = get_password_hash(user.password)
+    password_hash = await run_cpu_bound(request, get_password_hash, user.password)
+    
+    # Unique email/username constraints make a duplicate insert a no-op;
+    # ON CONFLICT DO NOTHING comes from the Postgres or the SQLite dev dialect
+    insert = sqlite.insert if db.bind.dialect.name == "sqlite" else postgresql.insert
+    stmt = (
+        insert(User)
+        .values(email=user.email, username=user.username, password_hash=password_hash)
+        .on_conflict_do_nothing()
+        .returning(User.id, User.email, User.username, User.created_at)
+    )
+    row = (await db.execute(stmt)).first()
+    
+    if row is None:
+        raise HTTPException(status_code=400, detail="Email or username already registered")
+    
+    await db.commit()
     
     return UserResponse(
-        id="temp-id",
-        email=user.email,
-        username=user.username,
-        created_at=datetime.utcnow()
+        id=str(row.id),
+        email=row.email,
+        username=row.username,
+        created_at=row.created_at
     )
 
 
 @router.post("/token", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
     """Login to get access token"""
-    # TODO: Authenticate user from database
-    # For now, accept any username/password combination
+    # Accept either email or username
+    result = await db.execute(
+        select(User.id, User.password_hash).where(
+            or_(User.email == form_data.username, User.username == form_data.username)
+        )
+    )
+    user = result.first()
+    
+    if not user or not await run_cpu_bound(
+        request, verify_password, form_data.password, user.password_hash
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": form_data.username}, expires_delta=access_token_expires
+        data={"sub": str(user.id)}, expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: dict = Depends(get_current_user)):
+async def read_users_me(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
     """Get current user info"""
-    # TODO: Return actual user data
+    result = await db.execute(
+        select(User.id, User.email, User.username, User.created_at).where(User.id == user_id)
+    )
+    user = result.first()
+    
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
     return UserResponse(
-        id=current_user["user_id"],
-        email="temp@example.com",
-        username=current_user["user_id"],
-        created_at=datetime.utcnow()
-    )
\ No newline at end of file
+        id=str(user.id),
+        email=user.email,
+        username=user.username,
+        created_at=user.created_at
+    )
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from typing import Dict, Any, Optional
 from datetime import datetime
+import asyncio
 import uuid
 import logging
 
@@ -10,10 +11,10 @@ from sqlalchemy import select, update
 
 from core.database import get_db
 from core.models.user import User
-from api.auth import get_current_user
+from api.auth import get_current_user, get_current_user_id
 from integrations.calendar.calendar_service import GoogleCalendarService
-from app.services.memory_service import MemoryService
-from app.services.cognitive_profile_service import CognitiveProfileService
+from app.services.memory_service import MemoryService, get_memory_service
+from app.services.cognitive_profile_service import CognitiveProfileService, get_cognitive_profile_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -48,7 +49,8 @@ async def authorize_calendar(
 async def oauth_callback(
     code: str,
     state: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    memory_service: MemoryService = Depends(get_memory_service)
 ):
     """Handle OAuth2 callback from Google"""
     # Verify state
@@ -64,7 +66,7 @@ async def oauth_callback(
     
     try:
         service = GoogleCalendarService()
-        token_data = service.handle_oauth_callback(code)
+        token_data = await asyncio.to_thread(service.handle_oauth_callback, code)
         
         # Store tokens in database
         result = await db.execute(
@@ -97,7 +99,6 @@ async def oauth_callback(
         await db.commit()
         
         # Store initial memory about calendar connection
-        memory_service = MemoryService()
         await memory_service.store_memory(
             db,
             user_id=user.id,
@@ -126,12 +127,10 @@ async def oauth_callback(
 
 @router.get("/status")
 async def get_calendar_status(
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get Google Calendar connection status"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     result = await db.execute(
         select(User).where(User.id == user_id)
     )
@@ -149,7 +148,7 @@ async def get_calendar_status(
         # Try to get calendar list to verify connection
         service = GoogleCalendarService()
         service.set_credentials(calendar_data)
-        calendars = service.get_calendar_list()
+        calendars = await asyncio.to_thread(service.get_calendar_list)
         
         return {
             "connected": True,
@@ -164,12 +163,10 @@ async def get_calendar_status(
 
 @router.get("/calendars")
 async def get_calendars(
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get list of user's calendars"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     # Get user's calendar credentials
     result = await db.execute(
         select(User).where(User.id == user_id)
@@ -182,7 +179,7 @@ async def get_calendars(
     try:
         service = GoogleCalendarService()
         service.set_credentials(user.integrations_data['calendar'])
-        calendars = service.get_calendar_list()
+        calendars = await asyncio.to_thread(service.get_calendar_list)
         
         return {"calendars": calendars}
     except Exception as e:
@@ -193,11 +190,12 @@ async def get_calendars(
 @router.post("/analyze")
 async def analyze_calendar(
     request: Dict[str, Any],
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    memory_service: MemoryService = Depends(get_memory_service),
+    cognitive_service: CognitiveProfileService = Depends(get_cognitive_profile_service)
 ):
     """Analyze calendar patterns and update cognitive profile"""
-    user_id = uuid.UUID(current_user["user_id"])
     max_events = request.get('max_events', 500)
     
     # Get user's calendar credentials
@@ -213,12 +211,9 @@ async def analyze_calendar(
         # Analyze calendar
         service = GoogleCalendarService()
         service.set_credentials(user.integrations_data['calendar'])
-        analysis = service.analyze_calendar_patterns(max_events=max_events)
+        analysis = await asyncio.to_thread(service.analyze_calendar_patterns, max_events=max_events)
         
         # Store insights as memories
-        memory_service = MemoryService()
-        cognitive_service = CognitiveProfileService()
-        
         # Store time patterns
         await memory_service.store_memory(
             db,
@@ -294,12 +289,11 @@ async def analyze_calendar(
 
 @router.post("/disconnect")
 async def disconnect_calendar(
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    memory_service: MemoryService = Depends(get_memory_service)
 ):
     """Disconnect Google Calendar"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     result = await db.execute(
         select(User).where(User.id == user_id)
     )
@@ -317,7 +311,6 @@ async def disconnect_calendar(
         await db.commit()
         
         # Store memory about disconnection
-        memory_service = MemoryService()
         await memory_service.store_memory(
             db,
             user_id=user_id,
@@ -336,12 +329,10 @@ async def disconnect_calendar(
 @router.get("/upcoming")
 async def get_upcoming_events(
     days: int = 7,
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get upcoming events for the next N days"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     # Get user's calendar credentials
     result = await db.execute(
         select(User).where(User.id == user_id)
@@ -362,7 +353,8 @@ async def get_upcoming_events(
         time_min = datetime.now(pytz.UTC)
         time_max = time_min + timedelta(days=days)
         
-        events = service.get_events(
+        events = await asyncio.to_thread(
+            service.get_events,
             time_min=time_min,
             time_max=time_max,
             max_results=50
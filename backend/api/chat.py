@@ -10,7 +10,7 @@ from core.database import get_db
 from api.auth import get_current_user
 from core.models.user import User
 from core.models.memory import Memory, MemoryType
-from app.services.enhanced_nlp import EnhancedNLPService
+from app.services.enhanced_nlp import get_enhanced_nlp_service
 from app.services.memory_service import MemoryService
 
 router = APIRouter()
@@ -59,8 +59,8 @@ async def send_message(
         except:
             pass
     
-    # Initialize enhanced NLP service
-    nlp = EnhancedNLPService()
+    # Shared enhanced NLP service
+    nlp = get_enhanced_nlp_service()
     
     # Check if we're in an active conversation (last message within 5 minutes)
     in_conversation = False
@@ -159,7 +159,7 @@ async def send_message(message: ChatMessage, user_id: str = Depends(get_current_
         topics=topics
     )
     
-    chat_history[user_id].append(ai_msg.dict())
+    chat_history[user_id].append(ai_msg.model_dump())
     
     return ai_msg
 
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
 import uuid
 
 from core.database import get_db
@@ -10,6 +11,26 @@ from app.services.cognitive_profile_service import CognitiveProfileService
 router = APIRouter()
 profile_service = CognitiveProfileService()
 
+# Preferences that can be edited manually
+ALLOWED_PREFERENCES = frozenset({
+    "preferred_communication_channels",
+    "peak_productivity_hours",
+    "preferred_task_types",
+    "stress_triggers",
+    "coping_mechanisms"
+})
+
+
+class PreferenceUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
+    key: str
+    value: List[str]
+
+
+# Built once so repeated requests reuse the compiled validator
+PREFERENCE_ADAPTER = TypeAdapter(PreferenceUpdate)
+
 @router.post("/analyze")
 async def analyze_profile(
     force_full_analysis: bool = False,
@@ -209,20 +230,18 @@ async def update_preference(
     profile = await profile_service.get_or_create_profile(db, user_uuid)
     
     # Validate and update preference
-    allowed_preferences = [
-        "preferred_communication_channels",
-        "peak_productivity_hours",
-        "preferred_task_types",
-        "stress_triggers",
-        "coping_mechanisms"
-    ]
-    
     preference_key = preference_data.get("key")
-    preference_value = preference_data.get("value")
     
-    if preference_key not in allowed_preferences:
+    if preference_key not in ALLOWED_PREFERENCES:
         raise HTTPException(status_code=400, detail=f"Invalid preference key: {preference_key}")
     
+    try:
+        preference = PREFERENCE_ADAPTER.validate_python(preference_data)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid preference value: {e.errors()[0]['msg']}")
+    
+    preference_value = preference.model_dump(mode="json")["value"]
+    
     setattr(profile, preference_key, preference_value)
     await db.commit()
     await db.refresh(profile)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, Optional
+import asyncio
 import uuid
 import os
 
@@ -64,7 +65,7 @@ async def gmail_callback(
     
     try:
         # Handle callback
-        result = gmail_service.handle_oauth_callback(code, auth_data["redirect_uri"])
+        result = await asyncio.to_thread(gmail_service.handle_oauth_callback, code, auth_data["redirect_uri"])
         
         # Store connection info as memory
         try:
@@ -105,7 +106,7 @@ async def analyze_emails(
     
     try:
         # Analyze emails
-        analysis = gmail_service.analyze_sent_emails(max_emails)
+        analysis = await asyncio.to_thread(gmail_service.analyze_sent_emails, max_emails)
         
         # Store insights as memories
         try:
@@ -176,7 +177,7 @@ async def get_email_templates(
     gmail_service = GmailService(user_id)
     
     try:
-        templates = gmail_service.get_email_templates()
+        templates = await asyncio.to_thread(gmail_service.get_email_templates)
         
         return {
             "templates": templates,
@@ -238,7 +239,7 @@ async def create_draft(
                 body = f"{body}\n\n{closing},"
         
         # Create draft
-        result = gmail_service.draft_email(to_email, subject, body)
+        result = await asyncio.to_thread(gmail_service.draft_email, to_email, subject, body)
         
         # Store as memory
         await memory_service.store_memory(
@@ -275,8 +276,8 @@ async def get_gmail_status(
     if is_connected:
         try:
             gmail_service = GmailService(user_id)
-            gmail_service._initialize_service()
-            profile = gmail_service._get_user_profile()
+            await asyncio.to_thread(gmail_service._initialize_service)
+            profile = await asyncio.to_thread(gmail_service._get_user_profile)
         except Exception as e:
             is_connected = False
             logger.error(f"Error checking Gmail status: {e}")
@@ -59,7 +59,7 @@ async def store_memory(
         "status": "memory_stored",
         "memory_id": str(memory.id),
         "type": memory.memory_type.value,
-        "has_embedding": bool(memory.embedding),
+        "has_embedding": memory.embedding is not None,
         "stored_at": memory.created_at.isoformat()
     }
 
@@ -6,7 +6,7 @@ import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
-from api.auth import get_current_user
+from api.auth import get_current_user, get_current_user_id
 from services.ml_service import MLService
 
 router = APIRouter()
@@ -19,12 +19,10 @@ ml_service = MLService()
 @router.post("/train/behavioral")
 async def train_behavioral_model(
     background_tasks: BackgroundTasks,
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Train behavioral pattern recognition model"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         # Run training in background for large datasets
         result = await ml_service.train_behavioral_model(db, user_id)
@@ -47,12 +45,10 @@ async def train_behavioral_model(
 
 @router.post("/train/communication")
 async def train_communication_model(
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Train communication style model"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         result = await ml_service.train_communication_model(db, user_id)
         
@@ -71,12 +67,10 @@ async def train_communication_model(
 
 @router.get("/analyze/current-behavior")
 async def analyze_current_behavior(
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Analyze current behavioral pattern"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         analysis = await ml_service.analyze_current_behavior(db, user_id)
         
@@ -96,12 +90,10 @@ async def analyze_current_behavior(
 @router.post("/analyze/communication")
 async def analyze_communication(
     messages: List[Dict[str, Any]],
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Analyze communication patterns from messages"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         if not messages:
             raise HTTPException(status_code=400, detail="No messages provided")
@@ -123,12 +115,10 @@ async def analyze_communication(
 
 @router.get("/insights")
 async def get_behavioral_insights(
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get comprehensive behavioral insights"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         insights = await ml_service.get_behavioral_insights(db, user_id)
         
@@ -206,12 +196,10 @@ async def get_communication_suggestions(
 
 @router.get("/models/status")
 async def get_model_status(
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get status of trained models for the user"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         # Check for existing models
         behavioral_model_exists = ml_service.behavioral_trainer.model is not None
@@ -262,12 +250,10 @@ async def get_model_status(
 @router.post("/train/all")
 async def train_all_models(
     background_tasks: BackgroundTasks,
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Train all available models for the user"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         results = {}
         
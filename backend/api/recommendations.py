@@ -6,7 +6,7 @@ import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
-from api.auth import get_current_user
+from api.auth import get_current_user_id
 from services.recommendation_engine import RecommendationEngine
 
 router = APIRouter()
@@ -19,12 +19,10 @@ recommendation_engine = RecommendationEngine()
 @router.get("/general")
 async def get_general_recommendations(
     category: Optional[str] = None,
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get general recommendations based on user patterns"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         # Build context if category specified
         context = {}
@@ -49,12 +47,10 @@ async def get_general_recommendations(
 @router.post("/decision-support")
 async def get_decision_support(
     decision_context: Dict[str, Any],
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get decision support for a specific decision"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         # Validate decision context
         if not decision_context.get('decision_type'):
@@ -84,12 +80,10 @@ async def get_decision_support(
 @router.get("/productivity")
 async def get_productivity_recommendations(
     timeframe: str = "today",
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get productivity-specific recommendations"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         context = {
             'focus_category': 'productivity',
@@ -119,12 +113,10 @@ async def get_productivity_recommendations(
 @router.get("/communication")
 async def get_communication_recommendations(
     context_type: Optional[str] = None,
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get communication-specific recommendations"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         context = {
             'focus_category': 'communication'
@@ -156,12 +148,10 @@ async def get_communication_recommendations(
 @router.get("/wellness")
 async def get_wellness_recommendations(
     focus_area: Optional[str] = None,
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get wellness and work-life balance recommendations"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         context = {
             'focus_category': 'wellness'
@@ -195,12 +185,10 @@ async def get_wellness_recommendations(
 @router.post("/quick-decision")
 async def get_quick_decision_help(
     decision_info: Dict[str, Any],
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get quick decision help for time-sensitive decisions"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         # Add time pressure context
         decision_context = {
@@ -237,12 +225,10 @@ async def get_quick_decision_help(
 
 @router.get("/daily")
 async def get_daily_recommendations(
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get daily personalized recommendations"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         # Generate comprehensive daily recommendations
         context = {
@@ -289,12 +275,10 @@ async def get_daily_recommendations(
 @router.post("/feedback")
 async def submit_recommendation_feedback(
     feedback: Dict[str, Any],
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Submit feedback on recommendations"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         # Validate feedback
         if 'recommendation_id' not in feedback:
@@ -339,12 +323,10 @@ async def submit_recommendation_feedback(
 @router.get("/history")
 async def get_recommendation_history(
     limit: int = 10,
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get history of past recommendations"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         # Get recommendation memories
         from services.memory_service import MemoryService
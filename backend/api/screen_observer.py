@@ -4,11 +4,13 @@ from datetime import datetime, timedelta
 import uuid
 import logging
 import asyncio
+from contextlib import suppress
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
-from api.auth import get_current_user
+from core.database import get_db, AsyncSessionLocal
+from core.cache import get_cached_json, set_cached_json
+from api.auth import get_current_user, get_current_user_id
 from services.screen_observer.screen_capture_service import ScreenCaptureService
 from services.screen_observer.activity_analyzer import ActivityAnalyzer
 
@@ -20,6 +22,10 @@ screen_service = ScreenCaptureService()
 activity_analyzer = ActivityAnalyzer()
 active_captures = {}  # user_id -> task mapping
 
+# Activity summaries are cached briefly to absorb frontend polling
+SUMMARY_CACHE_PREFIX = "screen:activity-summary:"
+SUMMARY_CACHE_TTL = 30  # seconds
+
 
 @router.post("/start")
 async def start_screen_capture(
@@ -34,14 +40,16 @@ async def start_screen_capture(
     if user_id in active_captures:
         return {"status": "already_running", "message": "Screen capture is already active"}
     
-    # Define callback for processing captures
-    async def process_capture(user_id: str, capture_data: Dict[str, Any]):
-        async with get_db() as db:
-            await activity_analyzer.process_screen_capture(user_id, capture_data, db)
+    # Define callback for processing captures on the loop's shared session
+    async def process_capture(user_id: str, capture_data: Dict[str, Any], db: AsyncSession):
+        await activity_analyzer.process_screen_capture(user_id, capture_data, db)
+        await db.commit()
     
     # Start capture in background
     task = asyncio.create_task(
-        screen_service.start_capture_loop(user_id, process_capture)
+        screen_service.start_capture_loop(
+            user_id, process_capture, session_factory=AsyncSessionLocal
+        )
     )
     active_captures[user_id] = task
     
@@ -65,10 +73,12 @@ async def stop_screen_capture(
     # Stop the capture
     screen_service.stop_capture()
     
-    # Cancel the task
+    # Cancel the task and wait for it to close its database session
     task = active_captures.get(user_id)
     if task:
         task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
     
     # Remove from active captures
     active_captures.pop(user_id, None)
@@ -134,20 +144,25 @@ async def capture_single_screenshot(
 @router.get("/activity-summary")
 async def get_activity_summary(
     hours: int = 24,
-    current_user: dict = Depends(get_current_user),
+    nocache: bool = False,
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get activity summary for the past N hours"""
-    user_id = uuid.UUID(current_user["user_id"])
+    cache_key = f"{SUMMARY_CACHE_PREFIX}{user_id}:{hours}"
+    if not nocache:
+        cached = await get_cached_json(cache_key)
+        if cached is not None:
+            return cached
     
     try:
         # Get summary from screen service
-        screen_summary = await screen_service.get_activity_summary(current_user["user_id"], hours)
+        screen_summary = await screen_service.get_activity_summary(str(user_id), hours)
         
         # Get daily summary from analyzer
         daily_summary = await activity_analyzer.generate_daily_summary(user_id, db)
         
-        return {
+        summary = {
             "screen_summary": screen_summary,
             "analysis_summary": daily_summary,
             "time_range": {
@@ -155,6 +170,9 @@ async def get_activity_summary(
                 "end": datetime.utcnow().isoformat()
             }
         }
+        await set_cached_json(cache_key, summary, SUMMARY_CACHE_TTL)
+        
+        return summary
         
     except Exception as e:
         logger.error(f"Error getting activity summary: {str(e)}")
@@ -163,12 +181,10 @@ async def get_activity_summary(
 
 @router.post("/analyze-batch")
 async def analyze_activity_batch(
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Manually trigger batch analysis of buffered activities"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         await activity_analyzer.analyze_activity_batch(user_id, db)
         
@@ -184,12 +200,10 @@ async def analyze_activity_batch(
 
 @router.get("/recommendations")
 async def get_activity_recommendations(
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get personalized recommendations based on screen activity patterns"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     try:
         # Generate daily summary which includes recommendations
         summary = await activity_analyzer.generate_daily_summary(user_id, db)
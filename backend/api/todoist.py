@@ -1,38 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
+from celery.result import AsyncResult
 from typing import Dict, Any, Optional
 from datetime import datetime
+import asyncio
+import json
 import uuid
 import logging
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, func, cast, text
+from sqlalchemy.dialects.postgresql import JSON, JSONB
 
 from core.database import get_db
+from core.cache import redis_client, get_cached_json, set_cached_json
+from core.celery_app import celery_app
 from core.models.user import User
-from api.auth import get_current_user
+from api.auth import get_current_user, get_current_user_id
 from integrations.todoist.todoist_service import TodoistService
-from app.services.memory_service import MemoryService
-from app.services.cognitive_profile_service import CognitiveProfileService
+from integrations.todoist.tasks import analyze_todoist_tasks
+from app.services.memory_service import MemoryService, get_memory_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# In-memory storage for OAuth states (use Redis in production)
-oauth_states = {}
+# OAuth states live in Redis so they are shared across workers and expire
+OAUTH_STATE_PREFIX = "oauth:todoist:"
+OAUTH_STATE_TTL = 600  # seconds
+
+# Task stats and summaries are cached briefly so polls skip the Todoist round trip
+STATS_CACHE_PREFIX = "todoist:stats:"
+SUMMARY_CACHE_PREFIX = "todoist:summary:"
+STATS_CACHE_TTL = 30  # seconds
+
+# Owner of each queued analysis job, kept as long as Celery keeps its result
+ANALYSIS_JOB_PREFIX = "todoist:job:"
+ANALYSIS_JOB_TTL = celery_app.conf.result_expires
+
+
+def get_todoist_service() -> TodoistService:
+    """Per-request service bound to the shared keep-alive HTTP client"""
+    return TodoistService()
 
 
 @router.get("/auth")
 async def authorize_todoist(
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    service: TodoistService = Depends(get_todoist_service)
 ):
     """Get Todoist OAuth authorization URL"""
     try:
-        service = TodoistService()
-        
         # Generate state for security
         state = str(uuid.uuid4())
-        oauth_states[state] = current_user["user_id"]
+        await redis_client.set(
+            f"{OAUTH_STATE_PREFIX}{state}", current_user["user_id"],
+            ex=OAUTH_STATE_TTL, nx=True
+        )
         
         auth_url = service.get_authorization_url(state)
         
@@ -46,57 +69,66 @@ async def authorize_todoist(
 async def oauth_callback(
     code: str,
     state: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    service: TodoistService = Depends(get_todoist_service),
+    memory_service: MemoryService = Depends(get_memory_service)
 ):
     """Handle OAuth2 callback from Todoist"""
-    # Verify state
-    user_id = oauth_states.get(state)
+    # Verify and consume state atomically
+    user_id = await redis_client.getdel(f"{OAUTH_STATE_PREFIX}{state}")
     if not user_id:
         return RedirectResponse(
             url="http://localhost:3000/integrations?todoist=error&message=Invalid state",
             status_code=302
         )
     
-    # Clean up state
-    del oauth_states[state]
-    
     try:
-        service = TodoistService()
-        token_data = service.handle_oauth_callback(code)
+        token_data = await service.handle_oauth_callback(code)
         
-        # Store tokens in database
-        result = await db.execute(
-            select(User).where(User.id == uuid.UUID(user_id))
-        )
-        user = result.scalar_one_or_none()
-        
-        if not user:
-            return RedirectResponse(
-                url="http://localhost:3000/integrations?todoist=error&message=User not found",
-                status_code=302
-            )
-        
-        # Update user's integrations data
-        integrations_data = user.integrations_data or {}
-        integrations_data['todoist'] = {
+        # Merge the Todoist entry into integrations_data server-side
+        todoist_data = {
             'connected': True,
             'email': token_data['user_email'],
             'access_token': token_data['access_token'],
             'connected_at': datetime.utcnow().isoformat()
         }
         
-        await db.execute(
-            update(User).where(User.id == user.id).values(
-                integrations_data=integrations_data
+        if db.bind.dialect.name == "sqlite":
+            integrations_data = func.json_set(
+                func.coalesce(User.integrations_data, func.json_object()),
+                '$.todoist',
+                func.json(json.dumps(todoist_data))
             )
+        else:
+            integrations_data = cast(
+                func.jsonb_set(
+                    func.coalesce(cast(User.integrations_data, JSONB), text("'{}'::jsonb")),
+                    text("'{todoist}'::text[]"),
+                    cast(todoist_data, JSONB)
+                ),
+                JSON
+            )
+        
+        result = await db.execute(
+            update(User)
+            .where(User.id == uuid.UUID(user_id))
+            .values(integrations_data=integrations_data)
+            .returning(User.id)
         )
+        updated_user_id = result.scalar_one_or_none()
+        
+        if not updated_user_id:
+            return RedirectResponse(
+                url="http://localhost:3000/integrations?todoist=error&message=User not found",
+                status_code=302
+            )
+        
         await db.commit()
         
         # Store initial memory about Todoist connection
-        memory_service = MemoryService()
         await memory_service.store_memory(
             db,
-            user_id=user.id,
+            user_id=updated_user_id,
             memory_type="procedural",
             content=f"Connected Todoist account: {token_data['user_email']}",
             source="todoist_integration",
@@ -122,16 +154,15 @@ async def oauth_callback(
 
 @router.get("/status")
 async def get_todoist_status(
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    service: TodoistService = Depends(get_todoist_service)
 ):
     """Get Todoist connection status"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     result = await db.execute(
-        select(User).where(User.id == user_id)
+        select(User.id, User.integrations_data).where(User.id == user_id)
     )
-    user = result.scalar_one_or_none()
+    user = result.first()
     
     if not user or not user.integrations_data:
         return {"connected": False}
@@ -143,9 +174,12 @@ async def get_todoist_status(
     
     try:
         # Try to get task stats to verify connection
-        service = TodoistService()
-        service.set_access_token(todoist_data['access_token'])
-        stats = service.get_task_stats()
+        cache_key = f"{STATS_CACHE_PREFIX}{user_id}"
+        stats = await get_cached_json(cache_key)
+        if stats is None:
+            service.set_access_token(todoist_data['access_token'])
+            stats = await service.get_task_stats()
+            await set_cached_json(cache_key, stats, STATS_CACHE_TTL)
         
         return {
             "connected": True,
@@ -159,133 +193,87 @@ async def get_todoist_status(
         return {"connected": False, "error": str(e)}
 
 
-@router.post("/analyze")
+@router.post("/analyze", status_code=202)
 async def analyze_tasks(
-    current_user: dict = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Analyze task patterns and update cognitive profile"""
-    user_id = uuid.UUID(current_user["user_id"])
-    
     # Get user's Todoist credentials
     result = await db.execute(
-        select(User).where(User.id == user_id)
+        select(User.id, User.integrations_data).where(User.id == user_id)
     )
-    user = result.scalar_one_or_none()
+    user = result.first()
     
     if not user or not user.integrations_data or not user.integrations_data.get('todoist', {}).get('connected'):
         raise HTTPException(status_code=403, detail="Todoist not connected")
     
-    try:
-        # Analyze tasks
-        service = TodoistService()
-        service.set_access_token(user.integrations_data['todoist']['access_token'])
-        analysis = service.analyze_task_patterns()
-        
-        # Store insights as memories
-        memory_service = MemoryService()
-        cognitive_service = CognitiveProfileService()
-        
-        # Store task management patterns
-        await memory_service.store_memory(
-            db,
-            user_id=user_id,
-            memory_type="semantic",
-            content=f"Task management: {analysis['active_tasks_count']} active tasks across {analysis['projects_count']} projects",
-            source="todoist_analysis",
-            metadata={
-                "analysis_type": "task_overview",
-                "stats": {
-                    "active_tasks": analysis['active_tasks_count'],
-                    "projects": analysis['projects_count'],
-                    "completed_30d": analysis['completed_tasks_30d']
-                }
-            }
-        )
-        
-        # Store productivity insights
-        productivity = analysis['productivity_insights']
-        if productivity['daily_average'] > 0:
-            await memory_service.store_memory(
-                db,
-                user_id=user_id,
-                memory_type="semantic",
-                content=f"Completes average of {productivity['daily_average']:.1f} tasks per day, most productive on {productivity.get('most_productive_day', 'weekdays')}",
-                source="todoist_analysis",
-                metadata={
-                    "productivity_metrics": productivity
-                }
-            )
-        
-        # Store priority usage patterns
-        priority_data = analysis['priority_usage']
-        await memory_service.store_memory(
-            db,
-            user_id=user_id,
-            memory_type="procedural",
-            content=f"Task prioritization: {priority_data['high_priority']} high priority, {priority_data['medium_priority']} medium priority tasks",
-            source="todoist_analysis",
-            metadata={
-                "priority_patterns": priority_data
-            }
-        )
-        
-        # Update cognitive profile based on task patterns
-        profile_updates = {}
-        
-        # High conscientiousness if many tasks with due dates and using priorities
-        task_patterns = analysis['task_patterns']
-        if task_patterns['tasks_with_due_dates_percentage'] > 70:
-            profile_updates['conscientiousness'] = 0.8
-        elif task_patterns['tasks_with_due_dates_percentage'] > 40:
-            profile_updates['conscientiousness'] = 0.6
-        
-        # Openness based on project diversity
-        project_dist = analysis['project_distribution']
-        if project_dist['project_count'] > 5:
-            profile_updates['openness'] = 0.7
-        
-        # Update profile if we have insights
-        if profile_updates:
-            await cognitive_service.update_profile_from_behaviors(
-                db, user_id, profile_updates
-            )
-        
+    # Queue the analysis; the worker pulls tasks, stores memories and updates the profile
+    job = analyze_todoist_tasks.delay(str(user_id))
+    await redis_client.set(f"{ANALYSIS_JOB_PREFIX}{job.id}", str(user_id), ex=ANALYSIS_JOB_TTL)
+    
+    return {"status": "queued", "job_id": job.id}
+
+
+@router.get("/analyze/status/{job_id}")
+async def get_analysis_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the status of a queued task analysis"""
+    # Only the user who queued a job may see its state, result or error
+    owner = await redis_client.get(f"{ANALYSIS_JOB_PREFIX}{job_id}")
+    if owner != current_user["user_id"]:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # Both reads go to the result backend, so keep them off the event loop
+    job = AsyncResult(job_id, app=celery_app)
+    state, result = await asyncio.to_thread(lambda: (job.state, job.result))
+    
+    if state == "SUCCESS":
         return {
             "status": "success",
-            "tasks_analyzed": analysis['active_tasks_count'],
-            "insights": analysis
+            "tasks_analyzed": result["tasks_analyzed"],
+            "insights": result["insights"]
         }
-        
-    except Exception as e:
-        logger.error(f"Error analyzing tasks: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    
+    if state == "FAILURE":
+        return {"status": "failed", "error": str(result)}
+    
+    return {"status": state.lower()}
 
 
 @router.get("/tasks/summary")
 async def get_tasks_summary(
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    nocache: bool = False,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    service: TodoistService = Depends(get_todoist_service)
 ):
     """Get summary of current tasks"""
-    user_id = uuid.UUID(current_user["user_id"])
+    cache_key = f"{SUMMARY_CACHE_PREFIX}{user_id}"
+    if not nocache:
+        cached = await get_cached_json(cache_key)
+        if cached is not None:
+            return cached
     
     # Get user's Todoist credentials
     result = await db.execute(
-        select(User).where(User.id == user_id)
+        select(User.id, User.integrations_data).where(User.id == user_id)
     )
-    user = result.scalar_one_or_none()
+    user = result.first()
     
     if not user or not user.integrations_data or not user.integrations_data.get('todoist', {}).get('connected'):
         raise HTTPException(status_code=403, detail="Todoist not connected")
     
     try:
-        service = TodoistService()
         service.set_access_token(user.integrations_data['todoist']['access_token'])
         
-        # Get today's tasks
-        today_tasks = service.get_tasks(filter='today')
-        overdue_tasks = service.get_tasks(filter='overdue')
+        # Get today's and overdue tasks concurrently
+        today_tasks, overdue_tasks = await asyncio.gather(
+            service.get_tasks(filter='today'),
+            service.get_tasks(filter='overdue')
+        )
         
         # Format tasks for frontend
         def format_task(task):
@@ -298,7 +286,7 @@ async def get_tasks_summary(
                 "labels": task.get('labels', [])
             }
         
-        return {
+        summary = {
             "today": [format_task(t) for t in today_tasks[:10]],
             "overdue": [format_task(t) for t in overdue_tasks[:10]],
             "counts": {
@@ -306,6 +294,9 @@ async def get_tasks_summary(
                 "overdue": len(overdue_tasks)
             }
         }
+        await set_cached_json(cache_key, summary, STATS_CACHE_TTL)
+        
+        return summary
         
     except Exception as e:
         logger.error(f"Error getting tasks summary: {str(e)}")
@@ -314,30 +305,31 @@ async def get_tasks_summary(
 
 @router.post("/disconnect")
 async def disconnect_todoist(
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    memory_service: MemoryService = Depends(get_memory_service)
 ):
     """Disconnect Todoist"""
-    user_id = uuid.UUID(current_user["user_id"])
+    # Drop the Todoist key server-side, only touching users that have it
+    if db.bind.dialect.name == "sqlite":
+        has_todoist = func.json_extract(User.integrations_data, '$.todoist').is_not(None)
+        integrations_data = func.json_remove(User.integrations_data, '$.todoist')
+    else:
+        integrations = cast(User.integrations_data, JSONB)
+        has_todoist = integrations.has_key('todoist')
+        integrations_data = cast(integrations.op('-')('todoist'), JSON)
     
     result = await db.execute(
-        select(User).where(User.id == user_id)
+        update(User)
+        .where(User.id == user_id, has_todoist)
+        .values(integrations_data=integrations_data)
+        .returning(User.id)
     )
-    user = result.scalar_one_or_none()
     
-    if user and user.integrations_data and 'todoist' in user.integrations_data:
-        integrations_data = user.integrations_data
-        del integrations_data['todoist']
-        
-        await db.execute(
-            update(User).where(User.id == user_id).values(
-                integrations_data=integrations_data
-            )
-        )
+    if result.scalar_one_or_none():
         await db.commit()
         
         # Store memory about disconnection
-        memory_service = MemoryService()
         await memory_service.store_memory(
             db,
             user_id=user_id,
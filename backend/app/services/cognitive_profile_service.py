@@ -1,24 +1,542 @@
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, FrozenSet
+from functools import lru_cache
 from datetime import datetime, timedelta
 import uuid
+import asyncio
+import hashlib
+import threading
 import numpy as np
 from collections import Counter, defaultdict
 import logging
+import operator
+import os
+from math import log1p
+import re
+import ahocorasick
+import marisa_trie
+import vaderSentiment
+from vaderSentiment.vaderSentiment import NEGATE, N_SCALAR
+from cachetools import LRUCache
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
-from textblob import TextBlob
+from sqlalchemy import select, and_, func, text
+from sqlalchemy.orm import load_only
 
-from core.models.cognitive_profile import CognitiveProfile, ProfileAnalysisLog
+from core.models.cognitive_profile import CognitiveProfile, ProfileAnalysisLog, ProfileKeyword, UserKeywordHit
 from core.models.memory import Memory, MemoryType
-from app.services.enhanced_nlp import EnhancedNLPService
+from app.services.enhanced_nlp import get_enhanced_nlp_service
 
 logger = logging.getLogger(__name__)
 
+# VADER's bundled word valences, scored directly by the batch polarity path
+SENTIMENT_LEXICON_PATH = os.path.join(os.path.dirname(vaderSentiment.__file__), "vader_lexicon.txt")
+MAX_VALENCE = 4.0
+NEGATIONS = frozenset(NEGATE)
+TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+# Keyword indicators used by the profile analyzers
+TRAIT_INDICATORS = {
+    "openness": {
+        "positive": frozenset(["creative", "curious", "explore", "new", "innovative", "art", "imagine", "adventure"]),
+        "negative": frozenset(["routine", "traditional", "conservative", "familiar"])
+    },
+    "conscientiousness": {
+        "positive": frozenset(["organized", "plan", "schedule", "complete", "responsible", "detail", "thorough"]),
+        "negative": frozenset(["spontaneous", "flexible", "improvise", "casual"])
+    },
+    "extraversion": {
+        "positive": frozenset(["social", "party", "friends", "group", "meeting", "talk", "energized"]),
+        "negative": frozenset(["alone", "quiet", "solitude", "introvert", "reserved"])
+    },
+    "agreeableness": {
+        "positive": frozenset(["help", "kind", "cooperate", "trust", "empathy", "support", "care"]),
+        "negative": frozenset(["compete", "argue", "disagree", "conflict", "challenge"])
+    },
+    "neuroticism": {
+        "positive": frozenset(["worry", "stress", "anxious", "upset", "nervous", "fear", "tense"]),
+        "negative": frozenset(["calm", "relaxed", "stable", "confident", "peaceful"])
+    }
+}
+
+FORMAL_INDICATORS = frozenset(["please", "thank you", "regards", "sincerely", "mr", "ms", "dr"])
+INFORMAL_INDICATORS = frozenset(["hey", "yeah", "cool", "awesome", "lol", "btw"])
+
+SPEED_INDICATORS = {
+    "fast": frozenset(["quickly", "immediately", "instant", "rapid", "spontaneous"]),
+    "slow": frozenset(["carefully", "considered", "analyzed", "researched", "deliberated"])
+}
+
+RISK_INDICATORS = {
+    "high": frozenset(["risk", "chance", "gamble", "bold", "venture"]),
+    "low": frozenset(["safe", "secure", "conservative", "careful", "cautious"])
+}
+
+ANALYTICAL_INDICATORS = frozenset(["data", "analysis", "research", "facts", "evidence", "logic"])
+INTUITIVE_INDICATORS = frozenset(["feel", "gut", "instinct", "sense", "intuition"])
+
+INTEREST_KEYWORDS = {
+    "technology": frozenset(["code", "programming", "software", "computer", "tech", "app", "digital"]),
+    "sports": frozenset(["game", "play", "sport", "exercise", "fitness", "team", "match"]),
+    "arts": frozenset(["art", "music", "paint", "draw", "creative", "design", "aesthetic"]),
+    "science": frozenset(["research", "experiment", "study", "discover", "hypothesis", "data"]),
+    "business": frozenset(["meeting", "client", "project", "revenue", "strategy", "market"]),
+    "travel": frozenset(["trip", "visit", "travel", "explore", "destination", "journey"]),
+    "food": frozenset(["cook", "eat", "restaurant", "recipe", "meal", "taste", "cuisine"]),
+    "health": frozenset(["health", "wellness", "medical", "doctor", "exercise", "nutrition"]),
+    "education": frozenset(["learn", "study", "course", "teach", "education", "knowledge"]),
+    "social": frozenset(["friend", "family", "party", "social", "community", "relationship"])
+}
+
+STRESS_INDICATORS = frozenset(["stress", "pressure", "overwhelm", "anxiety", "worry", "deadline"])
+COPING_INDICATORS = {
+    "exercise": frozenset(["run", "gym", "workout", "exercise", "walk"]),
+    "meditation": frozenset(["meditate", "breathe", "calm", "relax", "mindful"]),
+    "social": frozenset(["talk", "friend", "support", "share", "vent"]),
+    "creative": frozenset(["write", "draw", "music", "create", "express"]),
+    "problem-solving": frozenset(["solve", "plan", "organize", "tackle", "address"])
+}
+
+COLLABORATIVE_KEYWORDS = frozenset(["team", "together", "collaborate", "meeting", "discuss", "we"])
+INDEPENDENT_KEYWORDS = frozenset(["alone", "myself", "independent", "solo", "own"])
+
+TIME_REFERENCES = {
+    "morning": frozenset(["morning", "am", "early", "breakfast"]),
+    "afternoon": frozenset(["afternoon", "lunch", "noon"]),
+    "evening": frozenset(["evening", "pm", "night", "dinner"]),
+    "late_night": frozenset(["midnight", "late night", "2am", "3am"])
+}
+
+TASK_TYPES = {
+    "creative": frozenset(["create", "design", "innovate", "imagine", "brainstorm"]),
+    "analytical": frozenset(["analyze", "data", "calculate", "measure", "evaluate"]),
+    "social": frozenset(["meet", "present", "communicate", "network", "collaborate"]),
+    "administrative": frozenset(["organize", "schedule", "document", "report", "manage"])
+}
+
+SOCIAL_ENERGY_INDICATORS = {
+    "extrovert": frozenset(["party", "social", "group", "crowd", "networking", "energized"]),
+    "introvert": frozenset(["alone", "quiet", "recharge", "solitude", "small group", "one-on-one"])
+}
+
+RELATIONSHIP_INDICATORS = {
+    "deep": frozenset(["close friend", "best friend", "deep conversation", "meaningful", "trust"]),
+    "broad": frozenset(["networking", "acquaintance", "meet new", "social circle", "connections"])
+}
+
+# Fixed insights as (profile attribute, comparison, threshold, insight)
+INSIGHT_RULES = (
+    ("openness", operator.gt, 0.7, {
+        "type": "personality",
+        "insight": "You're highly open to new experiences. Consider exploring creative projects or learning new skills.",
+        "recommendations": ["Try new technologies", "Explore creative hobbies", "Travel to new places"]
+    }),
+    ("conscientiousness", operator.gt, 0.7, {
+        "type": "personality",
+        "insight": "Your high conscientiousness makes you reliable and organized. Use this strength for complex projects.",
+        "recommendations": ["Lead project planning", "Create systematic workflows", "Mentor others in organization"]
+    }),
+    ("social_energy", operator.lt, 0.3, {
+        "type": "social",
+        "insight": "You prefer smaller, intimate settings. Honor this preference for better well-being.",
+        "recommendations": ["Schedule regular alone time", "Prefer one-on-one meetings", "Create quiet workspaces"]
+    })
+)
+
+# Indicator groups that are only ever summed, so the database can count them
+# where the memories trigger is installed; their keywords are mirrored in the
+# profile_keywords table (add_user_keyword_hits)
+DB_COUNTED_GROUPS = frozenset(["interest", "work_style", "task"])
+
+# Memories fetched per round trip during a full analysis
+MEMORY_BATCH_SIZE = 1000
+
+# Per-memory analysis results kept between runs, keyed by (memory id, content digest)
+ANALYSIS_CACHE_SIZE = 100_000
+
+# Serialized profiles / dominant traits / insights kept per user until the profile changes
+PROFILE_VIEW_CACHE_SIZE = 10_000
+
+
+def _keyword_groups() -> Dict[Tuple[str, str], FrozenSet[str]]:
+    """Flatten the indicator tables into (group, label) -> keywords"""
+    groups = {}
+    for trait, indicators in TRAIT_INDICATORS.items():
+        for polarity, keywords in indicators.items():
+            groups[(trait, polarity)] = keywords
+    groups[("formality", "formal")] = FORMAL_INDICATORS
+    groups[("formality", "informal")] = INFORMAL_INDICATORS
+    for label, keywords in SPEED_INDICATORS.items():
+        groups[("speed", label)] = keywords
+    for label, keywords in RISK_INDICATORS.items():
+        groups[("risk", label)] = keywords
+    groups[("reasoning", "analytical")] = ANALYTICAL_INDICATORS
+    groups[("reasoning", "intuitive")] = INTUITIVE_INDICATORS
+    for category, keywords in INTEREST_KEYWORDS.items():
+        groups[("interest", category)] = keywords
+    groups[("stress", "stress")] = STRESS_INDICATORS
+    for method, keywords in COPING_INDICATORS.items():
+        groups[("coping", method)] = keywords
+    groups[("work_style", "collaborative")] = COLLABORATIVE_KEYWORDS
+    groups[("work_style", "independent")] = INDEPENDENT_KEYWORDS
+    for period, keywords in TIME_REFERENCES.items():
+        groups[("time", period)] = keywords
+    for task_type, keywords in TASK_TYPES.items():
+        groups[("task", task_type)] = keywords
+    for label, keywords in SOCIAL_ENERGY_INDICATORS.items():
+        groups[("social_energy", label)] = keywords
+    for label, keywords in RELATIONSHIP_INDICATORS.items():
+        groups[("relationship", label)] = keywords
+    return groups
+
+
+KEYWORD_GROUPS = _keyword_groups()
+
+
+def _db_keyword_tags() -> Dict[str, List[Tuple[str, str]]]:
+    """Map each database-counted keyword to the (group, label) tags it belongs to"""
+    tags_by_keyword = defaultdict(list)
+    for tag, keywords in KEYWORD_GROUPS.items():
+        if tag[0] in DB_COUNTED_GROUPS:
+            for keyword in keywords:
+                tags_by_keyword[keyword].append(tag)
+    return dict(tags_by_keyword)
+
+
+DB_KEYWORD_TAGS = _db_keyword_tags()
+
+NEGATIVE_EMOTIONS = frozenset(["angry", "frustrated", "upset"])
+POSITIVE_EMOTIONS = frozenset(["happy", "excited", "grateful"])
+
+
+def _keyword_occurrences(content, keywords):
+    """SQL expression counting whole-word occurrences of keywords in content
+    
+    Splitting on a word-bounded pattern yields (occurrences + 1) pieces.
+    """
+    return sum(
+        func.array_length(func.regexp_split_to_array(content, rf"\m{keyword}\M"), 1) - 1
+        for keyword in sorted(keywords)
+    )
+
+
+def _load_polarity_lexicon(path: str = SENTIMENT_LEXICON_PATH) -> Dict[str, float]:
+    """Load word polarities from VADER's lexicon, scaled from [-4, 4] to [-1, 1]"""
+    polarities = {}
+    with open(path, encoding="utf-8") as lexicon:
+        for line in lexicon:
+            token, valence = line.split("\t")[:2]
+            polarities[token] = float(valence) / MAX_VALENCE
+    return polarities
+
+
+def _build_keyword_trie() -> marisa_trie.RecordTrie:
+    """Map every Python-matched indicator keyword to the ids of its (group, label) tags"""
+    return marisa_trie.RecordTrie("<H", [
+        (keyword, (tag_id,))
+        for tag_id, tag in enumerate(KEYWORD_TAGS)
+        for keyword in KEYWORD_GROUPS[tag]
+    ])
+
+
+def _build_keyword_automaton() -> ahocorasick.Automaton:
+    """Build one Aho-Corasick automaton over every keyword in the trie"""
+    automaton = ahocorasick.Automaton()
+    for keyword in KEYWORD_TRIE.keys():
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+# Built once at import so forked workers share them; the trie lives in one
+# compact C buffer instead of thousands of refcounted Python objects
+KEYWORD_TAGS = list(KEYWORD_GROUPS)
+KEYWORD_TRIE = _build_keyword_trie()
+KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+# Column index of each (group, label) in a keyword hit vector
+TAG_IDS = {tag: tag_id for tag_id, tag in enumerate(KEYWORD_TAGS)}
+
+# Hit vector columns summed in Python when the database cannot count them
+DB_COUNTED_TAGS = [tag for tag in KEYWORD_TAGS if tag[0] in DB_COUNTED_GROUPS]
+DB_COUNTED_TAG_IDS = np.array([TAG_IDS[tag] for tag in DB_COUNTED_TAGS])
+COPING_METHODS = list(COPING_INDICATORS)
+COPING_TAG_IDS = np.array([TAG_IDS[("coping", method)] for method in COPING_METHODS])
+TIME_PERIODS = list(TIME_REFERENCES)
+TIME_TAG_IDS = np.array([TAG_IDS[("time", period)] for period in TIME_PERIODS])
+
+
+def _top_labels(labels: List[str], counts: np.ndarray, k: int) -> List[str]:
+    """Labels of the k largest positive counts, highest first"""
+    order = np.argsort(-counts, kind="stable")[:k]
+    return [labels[i] for i in order if counts[i] > 0]
+
+
+def _new_analysis_state() -> Dict[str, Dict[str, Any]]:
+    """Empty accumulator state for each profile analyzer"""
+    return {
+        "personality": {"keyword_net": dict.fromkeys(TRAIT_INDICATORS, 0), "sentiment_net": 0},
+        "communication": {"formality_net": 0, "word_total": 0, "memory_count": 0, "channels": defaultdict(int)},
+        "decision": {"speed": 0.5, "risk_tolerance": 0.5, "analytical_score": 0.5},
+        "interests": {"expertise": defaultdict(int)},
+        "emotional": {
+            "count": 0, "total": 0.0, "total_sq": 0.0,
+            "triggers": defaultdict(int), "coping": np.zeros(len(COPING_METHODS), dtype=np.int64)
+        },
+        "work": {"productivity_times": np.zeros(len(TIME_PERIODS), dtype=np.int64)},
+        "social": {"energy": 0.5, "depth": 0.5},
+        "keywords": {"totals": np.zeros(len(DB_COUNTED_TAGS), dtype=np.int64)}
+    }
+
+
 class CognitiveProfileService:
     """Service for building and maintaining user cognitive profiles"""
     
     def __init__(self):
-        self.nlp_service = EnhancedNLPService()
+        self.nlp_service = get_enhanced_nlp_service()
+        self._polarity = _load_polarity_lexicon()
+        self._analysis_cache = LRUCache(maxsize=ANALYSIS_CACHE_SIZE)
+        self._analysis_cache_lock = threading.Lock()
+        self._serialize_cache = LRUCache(maxsize=PROFILE_VIEW_CACHE_SIZE)
+        self._dominant_traits_cache = LRUCache(maxsize=PROFILE_VIEW_CACHE_SIZE)
+        self._insights_cache = LRUCache(maxsize=PROFILE_VIEW_CACHE_SIZE)
+        self._keyword_trigger_ready = False
+    
+    def _keyword_hits(self, content: str) -> np.ndarray:
+        """Count whole-word indicator keyword occurrences per tag id in a single pass
+        
+        Returns a vector indexed by TAG_IDS[(group, label)].
+        """
+        tag_ids = []
+        for end, keyword in KEYWORD_AUTOMATON.iter(content):
+            start = end - len(keyword) + 1
+            if start > 0 and content[start - 1].isalnum():
+                continue
+            if end + 1 < len(content) and content[end + 1].isalnum():
+                continue
+            tag_ids.extend(tag_id for (tag_id,) in KEYWORD_TRIE[keyword])
+        return np.bincount(np.asarray(tag_ids, dtype=np.intp), minlength=len(KEYWORD_TAGS))
+    
+    def _memory_features(self, memories: List[Memory], contents: List[str]) -> List[Tuple[np.ndarray, float]]:
+        """Keyword hits and sentiment polarity per memory
+        
+        Results are cached under the memory id and a digest of its content, so
+        unchanged memories are not re-analyzed and edited ones miss the cache.
+        
+        Args:
+            memories: Batch of memories to analyze
+            contents: Lowercased content of each memory
+            
+        Returns:
+            (keyword hits, polarity) for each memory, in order
+        """
+        keys = [
+            (memory.id, hashlib.blake2b(memory.content.encode(), digest_size=8).digest())
+            for memory in memories
+        ]
+        with self._analysis_cache_lock:
+            features = [self._analysis_cache.get(key) for key in keys]
+        
+        missing = [i for i, feature in enumerate(features) if feature is None]
+        if missing:
+            missing_contents = [contents[i] for i in missing]
+            polarities = self._batch_polarity(missing_contents)
+            computed = [
+                (self._keyword_hits(content), float(polarity))
+                for content, polarity in zip(missing_contents, polarities)
+            ]
+            with self._analysis_cache_lock:
+                for i, feature in zip(missing, computed):
+                    features[i] = feature
+                    self._analysis_cache[keys[i]] = feature
+        
+        return features
+    
+    async def _uses_keyword_trigger(self, db: AsyncSession) -> bool:
+        """Whether user_keyword_hits is kept current by the memories trigger
+        
+        Only Postgres databases migrated with add_user_keyword_hits have the
+        trigger; create_all and SQLite builds get an empty table. The seeded
+        profile_keywords must also match DB_KEYWORD_TAGS, or the counts would
+        silently miss keywords.
+        """
+        if db.bind.dialect.name != "postgresql":
+            return False
+        if self._keyword_trigger_ready:
+            return True
+        
+        trigger = await db.execute(
+            text("SELECT 1 FROM pg_trigger WHERE tgname = 'memories_keyword_hits'")
+        )
+        if trigger.first() is None:
+            return False
+        
+        keywords = set((await db.execute(select(ProfileKeyword.keyword))).scalars())
+        if keywords != DB_KEYWORD_TAGS.keys():
+            logger.error(
+                "profile_keywords differs from the service keyword tables "
+                f"(missing: {sorted(DB_KEYWORD_TAGS.keys() - keywords)}, "
+                f"extra: {sorted(keywords - DB_KEYWORD_TAGS.keys())}); counting keywords in Python"
+            )
+            return False
+        
+        self._keyword_trigger_ready = True
+        return True
+    
+    async def _keyword_totals(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        state: Dict[str, Any]
+    ) -> Counter:
+        """Total whole-word keyword occurrences per (group, label) for DB_COUNTED_GROUPS
+        
+        Reads the per-user keyword counts that the memories trigger keeps up to
+        date in user_keyword_hits, so no memory content is scanned here. Without
+        the trigger, the totals summed from the analyzed hit vectors are used.
+        
+        Args:
+            db: Database session
+            user_id: User whose keyword counts are read
+            state: Keyword totals accumulated by _update_keyword_totals
+            
+        Returns:
+            Counter keyed by (group, label)
+        """
+        if not await self._uses_keyword_trigger(db):
+            return Counter({
+                tag: int(count)
+                for tag, count in zip(DB_COUNTED_TAGS, state["totals"])
+                if count
+            })
+        
+        result = await db.execute(
+            select(UserKeywordHit.keyword, UserKeywordHit.count)
+            .where(UserKeywordHit.user_id == user_id)
+        )
+        
+        totals = Counter()
+        for keyword, count in result:
+            for tag in DB_KEYWORD_TAGS.get(keyword, ()):
+                totals[tag] += count
+        return totals
+    
+    async def _personality_votes(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        *criteria
+    ) -> Tuple[int, Dict[str, int]]:
+        """Memory count and per-trait keyword votes, aggregated by the database
+        
+        Each memory votes sign(positive - negative) for every trait, the same
+        rule _update_personality applies in Python.
+        
+        Args:
+            db: Database session
+            user_id: User whose memories are scored
+            *criteria: Extra filters on Memory
+            
+        Returns:
+            (number of matching memories, trait -> summed votes)
+        """
+        lowered = (
+            select(func.lower(Memory.content).label("content"))
+            .where(Memory.user_id == user_id, *criteria)
+            .cte("lowered")
+        )
+        votes = [
+            func.coalesce(func.sum(func.sign(
+                _keyword_occurrences(lowered.c.content, indicators["positive"])
+                - _keyword_occurrences(lowered.c.content, indicators["negative"])
+            )), 0)
+            for indicators in TRAIT_INDICATORS.values()
+        ]
+        
+        result = await db.execute(select(func.count(), *votes).select_from(lowered))
+        memory_count, *trait_votes = result.one()
+        return memory_count, {trait: int(vote) for trait, vote in zip(TRAIT_INDICATORS, trait_votes)}
+    
+    async def _sentiment_votes(self, db: AsyncSession, user_id: uuid.UUID, *criteria) -> int:
+        """Net neuroticism vote from the sentiment of matching memories
+        
+        Each strongly negative memory votes +1 and each strongly positive one
+        -1, the same rule _update_personality applies.
+        
+        Args:
+            db: Database session
+            user_id: User whose memories are scored
+            *criteria: Extra filters on Memory
+            
+        Returns:
+            Summed sentiment votes
+        """
+        sentiment_net = 0
+        result = await db.stream(
+            select(func.lower(Memory.content))
+            .where(Memory.user_id == user_id, *criteria)
+            .execution_options(yield_per=MEMORY_BATCH_SIZE)
+        )
+        async for contents in result.scalars().partitions():
+            polarities = await asyncio.to_thread(self._batch_polarity, contents)
+            sentiment_net += int((polarities < -0.3).sum()) - int((polarities > 0.3).sum())
+        return sentiment_net
+    
+    async def _scan_personality(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        *criteria
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Memory count and personality votes, scored in Python
+        
+        Used where the database cannot run _personality_votes, which relies on
+        Postgres regular expressions.
+        
+        Args:
+            db: Database session
+            user_id: User whose memories are scored
+            *criteria: Extra filters on Memory
+            
+        Returns:
+            (number of matching memories, personality state for _finalize_personality)
+        """
+        state = _new_analysis_state()["personality"]
+        memory_count = 0
+        
+        result = await db.stream(
+            select(Memory)
+            .options(load_only(Memory.content))
+            .where(Memory.user_id == user_id, *criteria)
+            .execution_options(yield_per=MEMORY_BATCH_SIZE)
+        )
+        async for memories in result.scalars().partitions():
+            memory_count += len(memories)
+            contents = [memory.content.lower() for memory in memories]
+            features = await asyncio.to_thread(self._memory_features, memories, contents)
+            self._update_personality(state, features)
+        
+        return memory_count, state
+    
+    def _batch_polarity(self, contents: List[str]) -> np.ndarray:
+        """Mean lexicon polarity of each (lowercased) content, in [-1, 1]
+        
+        Words following a negation are scaled by VADER's negation factor;
+        words missing from the lexicon do not count.
+        """
+        polarities = np.zeros(len(contents))
+        for i, content in enumerate(contents):
+            scores = []
+            negated = False
+            for token in TOKEN_PATTERN.findall(content):
+                if token in NEGATIONS or token.endswith("n't"):
+                    negated = True
+                    continue
+                score = self._polarity.get(token)
+                if score is not None:
+                    scores.append(N_SCALAR * score if negated else score)
+                    negated = False
+            if scores:
+                polarities[i] = np.mean(scores)
+        return polarities
         
     async def get_or_create_profile(
         self,
@@ -48,12 +566,51 @@ class CognitiveProfileService:
         """Analyze user's memories and interactions to build/update cognitive profile"""
         profile = await self.get_or_create_profile(db, user_id)
         
+        # Nothing was added, edited or removed since the last analysis: reuse it
+        fingerprint = await self._memory_fingerprint(db, user_id)
+        if (
+            not force_full_analysis
+            and profile.analysis_count
+            and profile.last_analysis_fingerprint == fingerprint
+        ):
+            return {
+                "status": "success",
+                "update_type": "unchanged",
+                "profile": self._serialize_profile(profile)
+            }
+        
+        # Saved together with the analysis results on commit
+        profile.last_analysis_fingerprint = fingerprint
+        
         # Determine if we need full analysis or incremental update
         if force_full_analysis or profile.analysis_count == 0:
             return await self._full_profile_analysis(db, user_id, profile)
         else:
             return await self._incremental_profile_update(db, user_id, profile)
     
+    async def _memory_fingerprint(self, db: AsyncSession, user_id: uuid.UUID) -> bytes:
+        """Digest the user's memory set without loading any rows.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the memories
+            
+        Returns:
+            bytes: blake2b digest of the memory count and newest created/updated times
+        """
+        result = await db.execute(
+            select(
+                func.count(Memory.id),
+                func.max(Memory.created_at),
+                func.max(Memory.updated_at)
+            ).where(Memory.user_id == user_id)
+        )
+        count, last_created, last_updated = result.one()
+        return hashlib.blake2b(
+            f"{count}|{last_created}|{last_updated}".encode(),
+            digest_size=16
+        ).digest()
+    
     async def _full_profile_analysis(
         self,
         db: AsyncSession,
@@ -61,26 +618,51 @@ class CognitiveProfileService:
         profile: CognitiveProfile
     ) -> Dict[str, Any]:
         """Perform comprehensive analysis of all user data"""
-        # Get all user memories
-        result = await db.execute(
-            select(Memory).where(Memory.user_id == user_id)
+        state = _new_analysis_state()
+        memory_count = 0
+        
+        # Stream user memories in batches so only one batch is held at a time
+        # Analyzers only read id, content and meta_data; skip embeddings and the rest
+        result = await db.stream(
+            select(Memory)
+            .options(load_only(Memory.content, Memory.meta_data))
+            .where(Memory.user_id == user_id)
+            .execution_options(yield_per=MEMORY_BATCH_SIZE)
         )
-        memories = result.scalars().all()
+        async for memories in result.scalars().partitions():
+            memory_count += len(memories)
+            
+            # Lowercase each memory once and share it across every analyzer
+            contents = [memory.content.lower() for memory in memories]
+            features = await asyncio.to_thread(self._memory_features, memories, contents)
+            
+            # Analyze different aspects (independent of each other, so run them side by side)
+            await asyncio.gather(
+                asyncio.to_thread(self._update_personality, state["personality"], features),
+                asyncio.to_thread(self._update_communication_style, state["communication"], memories, contents, features),
+                asyncio.to_thread(self._update_decision_making, state["decision"], contents, features),
+                asyncio.to_thread(self._update_interests, state["interests"], memories),
+                asyncio.to_thread(self._update_emotional_patterns, state["emotional"], memories, contents, features),
+                asyncio.to_thread(self._update_work_preferences, state["work"], contents, features),
+                asyncio.to_thread(self._update_social_preferences, state["social"], features),
+                asyncio.to_thread(self._update_keyword_totals, state["keywords"], features)
+            )
         
-        if not memories:
+        if not memory_count:
             return {
                 "status": "no_data",
                 "message": "No memories found for analysis"
             }
         
-        # Analyze different aspects
-        personality_traits = await self._analyze_personality(memories)
-        communication_style = await self._analyze_communication_style(memories)
-        decision_patterns = await self._analyze_decision_making(memories)
-        interests = await self._analyze_interests(memories)
-        emotional_patterns = await self._analyze_emotional_patterns(memories)
-        work_preferences = await self._analyze_work_preferences(memories)
-        social_preferences = await self._analyze_social_preferences(memories)
+        keyword_totals = await self._keyword_totals(db, user_id, state["keywords"])
+        
+        personality_traits = self._finalize_personality(state["personality"])
+        communication_style = self._finalize_communication_style(state["communication"])
+        decision_patterns = self._finalize_decision_making(state["decision"])
+        interests = self._finalize_interests(state["interests"], keyword_totals)
+        emotional_patterns = self._finalize_emotional_patterns(state["emotional"])
+        work_preferences = self._finalize_work_preferences(state["work"], keyword_totals)
+        social_preferences = self._finalize_social_preferences(state["social"])
         
         # Update profile
         updates = {
@@ -116,9 +698,9 @@ class CognitiveProfileService:
             "relationship_depth": social_preferences["depth"],
             
             # Metadata
-            "profile_confidence": self._calculate_confidence(len(memories)),
+            "profile_confidence": self._calculate_confidence(memory_count),
             "analysis_count": profile.analysis_count + 1,
-            "data_points": len(memories)
+            "data_points": memory_count
         }
         
         # Apply updates to profile
@@ -129,7 +711,7 @@ class CognitiveProfileService:
         analysis_log = ProfileAnalysisLog(
             profile_id=profile.id,
             analysis_type="full_analysis",
-            source_data={"memory_count": len(memories)},
+            source_data={"memory_count": memory_count},
             results=updates,
             adjustments=updates,
             confidence=updates["profile_confidence"]
@@ -138,100 +720,74 @@ class CognitiveProfileService:
         
         await db.commit()
         await db.refresh(profile)
+        self._invalidate_profile_views(user_id)
         
         return {
             "status": "success",
             "profile": self._serialize_profile(profile),
             "analysis_summary": {
-                "memories_analyzed": len(memories),
+                "memories_analyzed": memory_count,
                 "confidence": updates["profile_confidence"],
                 "dominant_traits": self._get_dominant_traits(profile)
             }
         }
     
-    async def _analyze_personality(self, memories: List[Memory]) -> Dict[str, float]:
-        """Analyze Big Five personality traits from memories"""
-        traits = {
-            "openness": 0.5,
-            "conscientiousness": 0.5,
-            "extraversion": 0.5,
-            "agreeableness": 0.5,
-            "neuroticism": 0.5
-        }
-        
-        # Keywords and patterns for each trait
-        trait_indicators = {
-            "openness": {
-                "positive": ["creative", "curious", "explore", "new", "innovative", "art", "imagine", "adventure"],
-                "negative": ["routine", "traditional", "conservative", "familiar"]
-            },
-            "conscientiousness": {
-                "positive": ["organized", "plan", "schedule", "complete", "responsible", "detail", "thorough"],
-                "negative": ["spontaneous", "flexible", "improvise", "casual"]
-            },
-            "extraversion": {
-                "positive": ["social", "party", "friends", "group", "meeting", "talk", "energized"],
-                "negative": ["alone", "quiet", "solitude", "introvert", "reserved"]
-            },
-            "agreeableness": {
-                "positive": ["help", "kind", "cooperate", "trust", "empathy", "support", "care"],
-                "negative": ["compete", "argue", "disagree", "conflict", "challenge"]
-            },
-            "neuroticism": {
-                "positive": ["worry", "stress", "anxious", "upset", "nervous", "fear", "tense"],
-                "negative": ["calm", "relaxed", "stable", "confident", "peaceful"]
-            }
-        }
-        
-        # Analyze each memory
-        for memory in memories:
-            content = memory.content.lower()
-            sentiment = TextBlob(content).sentiment
-            
-            for trait, indicators in trait_indicators.items():
-                positive_count = sum(1 for word in indicators["positive"] if word in content)
-                negative_count = sum(1 for word in indicators["negative"] if word in content)
-                
-                # Adjust trait score
-                if positive_count > negative_count:
-                    traits[trait] = min(1.0, traits[trait] + 0.05)
-                elif negative_count > positive_count:
-                    traits[trait] = max(0.0, traits[trait] - 0.05)
-                
-                # Consider sentiment for neuroticism
-                if trait == "neuroticism":
-                    if sentiment.polarity < -0.3:
-                        traits[trait] = min(1.0, traits[trait] + 0.03)
-                    elif sentiment.polarity > 0.3:
-                        traits[trait] = max(0.0, traits[trait] - 0.03)
-        
-        return traits
+    def _hit_matrix(self, features: List[Tuple[np.ndarray, float]]) -> np.ndarray:
+        """Stack a batch's keyword hit vectors into a (memories x tags) matrix"""
+        if not features:
+            return np.zeros((0, len(KEYWORD_TAGS)), dtype=np.int64)
+        return np.stack([hits for hits, _ in features])
     
-    async def _analyze_communication_style(self, memories: List[Memory]) -> Dict[str, Any]:
-        """Analyze communication patterns and preferences"""
-        formality_score = 0.5
-        verbosity_scores = []
-        channels = defaultdict(int)
-        
-        formal_indicators = ["please", "thank you", "regards", "sincerely", "mr", "ms", "dr"]
-        informal_indicators = ["hey", "yeah", "cool", "awesome", "lol", "btw"]
-        
-        for memory in memories:
-            content = memory.content.lower()
-            
-            # Formality analysis
-            formal_count = sum(1 for word in formal_indicators if word in content)
-            informal_count = sum(1 for word in informal_indicators if word in content)
-            
-            if formal_count > informal_count:
-                formality_score = min(1.0, formality_score + 0.02)
-            elif informal_count > formal_count:
-                formality_score = max(0.0, formality_score - 0.02)
-            
-            # Verbosity analysis
-            word_count = len(content.split())
-            verbosity_scores.append(word_count)
-            
+    def _update_personality(self, state: Dict[str, Any], features: List[Tuple[np.ndarray, float]]) -> None:
+        """Accumulate Big Five personality evidence from a batch of memory features
+        
+        Each memory votes +1/-1 per trait depending on whether positive or
+        negative indicators dominate; strongly negative/positive sentiment adds
+        a separate vote for neuroticism.
+        """
+        keyword_net = state["keyword_net"]
+        hit_matrix = self._hit_matrix(features)
+        for trait in keyword_net:
+            positive_counts = hit_matrix[:, TAG_IDS[(trait, "positive")]]
+            negative_counts = hit_matrix[:, TAG_IDS[(trait, "negative")]]
+            keyword_net[trait] += int(np.sign(positive_counts - negative_counts).sum())
+        
+        # Consider sentiment for neuroticism
+        polarities = np.fromiter((polarity for _, polarity in features), dtype=float, count=len(features))
+        state["sentiment_net"] += int((polarities < -0.3).sum()) - int((polarities > 0.3).sum())
+    
+    def _update_keyword_totals(self, state: Dict[str, Any], features: List[Tuple[np.ndarray, float]]) -> None:
+        """Sum a batch's DB_COUNTED_GROUPS keyword hits, used when the database does not count them"""
+        state["totals"] += self._hit_matrix(features)[:, DB_COUNTED_TAG_IDS].sum(axis=0)
+    
+    def _finalize_personality(self, state: Dict[str, Any]) -> Dict[str, float]:
+        """Big Five personality traits in closed form from the accumulated votes"""
+        scores = {trait: 0.5 + 0.05 * net for trait, net in state["keyword_net"].items()}
+        scores["neuroticism"] += 0.03 * state["sentiment_net"]
+        return {trait: float(np.clip(score, 0.0, 1.0)) for trait, score in scores.items()}
+    
+    def _update_communication_style(
+        self,
+        state: Dict[str, Any],
+        memories: List[Memory],
+        contents: List[str],
+        features: List[Tuple[np.ndarray, float]]
+    ) -> None:
+        """Accumulate communication patterns and preferences from a batch of memories"""
+        channels = state["channels"]
+        hit_matrix = self._hit_matrix(features)
+        
+        # Formality analysis: net count of memories leaning formal vs informal
+        formal_counts = hit_matrix[:, TAG_IDS[("formality", "formal")]]
+        informal_counts = hit_matrix[:, TAG_IDS[("formality", "informal")]]
+        state["formality_net"] += int(np.sign(formal_counts - informal_counts).sum())
+        
+        # Verbosity analysis
+        word_counts = np.fromiter((len(content.split()) for content in contents), dtype=np.int32, count=len(contents))
+        state["word_total"] += int(word_counts.sum())
+        state["memory_count"] += len(contents)
+        
+        for memory, content in zip(memories, contents):
             # Channel preferences from metadata
             if memory.meta_data:
                 if "channel" in memory.meta_data:
@@ -244,110 +800,88 @@ class CognitiveProfileService:
                     channels["voice"] += 1
                 elif "message" in content or "chat" in content:
                     channels["chat"] += 1
+    
+    def _finalize_communication_style(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Communication formality, verbosity and top channels"""
+        formality = float(np.clip(0.5 + 0.02 * state["formality_net"], 0.0, 1.0))
         
         # Calculate verbosity (normalized)
-        avg_words = np.mean(verbosity_scores) if verbosity_scores else 50
+        avg_words = state["word_total"] / state["memory_count"] if state["memory_count"] else 50
         verbosity = min(1.0, avg_words / 200)  # Normalize to 0-1
         
         # Get top channels
-        top_channels = sorted(channels.items(), key=lambda x: x[1], reverse=True)[:3]
+        top_channels = sorted(state["channels"].items(), key=lambda x: x[1], reverse=True)[:3]
         
         return {
-            "formality": formality_score,
+            "formality": formality,
             "verbosity": verbosity,
             "channels": [ch[0] for ch in top_channels] if top_channels else ["chat"]
         }
     
-    async def _analyze_decision_making(self, memories: List[Memory]) -> Dict[str, float]:
-        """Analyze decision-making patterns"""
-        decision_memories = [m for m in memories if "decide" in m.content.lower() or "choice" in m.content.lower()]
-        
-        speed_indicators = {
-            "fast": ["quickly", "immediately", "instant", "rapid", "spontaneous"],
-            "slow": ["carefully", "considered", "analyzed", "researched", "deliberated"]
-        }
-        
-        risk_indicators = {
-            "high": ["risk", "chance", "gamble", "bold", "venture"],
-            "low": ["safe", "secure", "conservative", "careful", "cautious"]
-        }
-        
-        analytical_indicators = ["data", "analysis", "research", "facts", "evidence", "logic"]
-        intuitive_indicators = ["feel", "gut", "instinct", "sense", "intuition"]
-        
-        speed_score = 0.5
-        risk_score = 0.5
-        analytical_score = 0.5
+    def _update_decision_making(
+        self,
+        state: Dict[str, Any],
+        contents: List[str],
+        features: List[Tuple[np.ndarray, float]]
+    ) -> None:
+        """Accumulate decision-making patterns from a batch of memories"""
+        decision_hits = [
+            hits for content, (hits, _) in zip(contents, features)
+            if "decide" in content or "choice" in content
+        ]
         
-        for memory in decision_memories:
-            content = memory.content.lower()
-            
+        for hits in decision_hits:
             # Decision speed
-            fast_count = sum(1 for word in speed_indicators["fast"] if word in content)
-            slow_count = sum(1 for word in speed_indicators["slow"] if word in content)
+            fast_count = hits[TAG_IDS[("speed", "fast")]]
+            slow_count = hits[TAG_IDS[("speed", "slow")]]
             
             if fast_count > slow_count:
-                speed_score = min(1.0, speed_score + 0.1)
+                state["speed"] = min(1.0, state["speed"] + 0.1)
             elif slow_count > fast_count:
-                speed_score = max(0.0, speed_score - 0.1)
+                state["speed"] = max(0.0, state["speed"] - 0.1)
             
             # Risk tolerance
-            high_risk = sum(1 for word in risk_indicators["high"] if word in content)
-            low_risk = sum(1 for word in risk_indicators["low"] if word in content)
+            high_risk = hits[TAG_IDS[("risk", "high")]]
+            low_risk = hits[TAG_IDS[("risk", "low")]]
             
             if high_risk > low_risk:
-                risk_score = min(1.0, risk_score + 0.1)
+                state["risk_tolerance"] = min(1.0, state["risk_tolerance"] + 0.1)
             elif low_risk > high_risk:
-                risk_score = max(0.0, risk_score - 0.1)
+                state["risk_tolerance"] = max(0.0, state["risk_tolerance"] - 0.1)
             
             # Analytical vs intuitive
-            analytical_count = sum(1 for word in analytical_indicators if word in content)
-            intuitive_count = sum(1 for word in intuitive_indicators if word in content)
+            analytical_count = hits[TAG_IDS[("reasoning", "analytical")]]
+            intuitive_count = hits[TAG_IDS[("reasoning", "intuitive")]]
             
             if analytical_count > intuitive_count:
-                analytical_score = min(1.0, analytical_score + 0.1)
+                state["analytical_score"] = min(1.0, state["analytical_score"] + 0.1)
             elif intuitive_count > analytical_count:
-                analytical_score = max(0.0, analytical_score - 0.1)
-        
-        return {
-            "speed": speed_score,
-            "risk_tolerance": risk_score,
-            "analytical_score": analytical_score
-        }
+                state["analytical_score"] = max(0.0, state["analytical_score"] - 0.1)
     
-    async def _analyze_interests(self, memories: List[Memory]) -> Dict[str, Any]:
-        """Analyze user interests and expertise areas"""
-        interest_keywords = {
-            "technology": ["code", "programming", "software", "computer", "tech", "app", "digital"],
-            "sports": ["game", "play", "sport", "exercise", "fitness", "team", "match"],
-            "arts": ["art", "music", "paint", "draw", "creative", "design", "aesthetic"],
-            "science": ["research", "experiment", "study", "discover", "hypothesis", "data"],
-            "business": ["meeting", "client", "project", "revenue", "strategy", "market"],
-            "travel": ["trip", "visit", "travel", "explore", "destination", "journey"],
-            "food": ["cook", "eat", "restaurant", "recipe", "meal", "taste", "cuisine"],
-            "health": ["health", "wellness", "medical", "doctor", "exercise", "nutrition"],
-            "education": ["learn", "study", "course", "teach", "education", "knowledge"],
-            "social": ["friend", "family", "party", "social", "community", "relationship"]
-        }
-        
-        interest_scores = defaultdict(float)
-        expertise_mentions = defaultdict(int)
+    def _finalize_decision_making(self, state: Dict[str, Any]) -> Dict[str, float]:
+        """Decision speed, risk tolerance and analytical score"""
+        return dict(state)
+    
+    def _update_interests(self, state: Dict[str, Any], memories: List[Memory]) -> None:
+        """Accumulate expertise mentions from a batch of memories"""
+        expertise_mentions = state["expertise"]
         
         for memory in memories:
-            content = memory.content.lower()
-            
-            # Score interests
-            for category, keywords in interest_keywords.items():
-                matches = sum(1 for word in keywords if word in content)
-                if matches > 0:
-                    interest_scores[category] += matches
-            
             # Extract expertise from metadata
             if memory.meta_data and "activity" in memory.meta_data:
                 activities = memory.meta_data["activity"]
                 if isinstance(activities, list):
                     for activity in activities:
                         expertise_mentions[activity] += 1
+    
+    def _finalize_interests(self, state: Dict[str, Any], keyword_totals: Counter) -> Dict[str, Any]:
+        """User interests and expertise areas"""
+        # Score interests
+        interest_scores = {
+            category: float(keyword_totals[("interest", category)])
+            for category in INTEREST_KEYWORDS
+            if keyword_totals[("interest", category)] > 0
+        }
         
         # Normalize interest scores
         total_score = sum(interest_scores.values())
@@ -362,7 +896,7 @@ class CognitiveProfileService:
         # Get top expertise areas
         expertise_areas = [
             area for area, count in sorted(
-                expertise_mentions.items(), 
+                state["expertise"].items(), 
                 key=lambda x: x[1], 
                 reverse=True
             )[:5]
@@ -373,30 +907,27 @@ class CognitiveProfileService:
             "expertise": expertise_areas
         }
     
-    async def _analyze_emotional_patterns(self, memories: List[Memory]) -> Dict[str, Any]:
-        """Analyze emotional patterns and stability"""
-        emotions = []
-        stress_indicators = ["stress", "pressure", "overwhelm", "anxiety", "worry", "deadline"]
-        coping_indicators = {
-            "exercise": ["run", "gym", "workout", "exercise", "walk"],
-            "meditation": ["meditate", "breathe", "calm", "relax", "mindful"],
-            "social": ["talk", "friend", "support", "share", "vent"],
-            "creative": ["write", "draw", "music", "create", "express"],
-            "problem-solving": ["solve", "plan", "organize", "tackle", "address"]
-        }
-        
-        triggers = defaultdict(int)
-        coping_methods = defaultdict(int)
-        
-        for memory in memories:
-            content = memory.content.lower()
-            
-            # Get sentiment
-            sentiment = TextBlob(content).sentiment
-            emotions.append(sentiment.polarity)
-            
+    def _update_emotional_patterns(
+        self,
+        state: Dict[str, Any],
+        memories: List[Memory],
+        contents: List[str],
+        features: List[Tuple[np.ndarray, float]]
+    ) -> None:
+        """Accumulate emotional patterns from a batch of memories
+        
+        Emotion values are folded into a running count, sum and sum of squares
+        so the variance never needs the full list of values.
+        """
+        triggers = state["triggers"]
+        
+        # Sentiment comes straight from the shared feature polarities
+        polarities = np.fromiter((polarity for _, polarity in features), dtype=np.float32, count=len(features))
+        metadata_emotions = []
+        
+        for memory, content, (hits, _) in zip(memories, contents, features):
             # Identify stress triggers
-            if any(indicator in content for indicator in stress_indicators):
+            if hits[TAG_IDS[("stress", "stress")]]:
                 # Look for context
                 if "deadline" in content:
                     triggers["deadlines"] += 1
@@ -407,74 +938,68 @@ class CognitiveProfileService:
                 if "change" in content:
                     triggers["change"] += 1
             
-            # Identify coping mechanisms
-            for method, keywords in coping_indicators.items():
-                if any(keyword in content for keyword in keywords):
-                    coping_methods[method] += 1
-            
             # Check metadata for emotions
             if memory.meta_data and "emotions" in memory.meta_data:
                 for emotion in memory.meta_data["emotions"]:
-                    if emotion in ["angry", "frustrated", "upset"]:
-                        emotions.append(-0.5)
-                    elif emotion in ["happy", "excited", "grateful"]:
-                        emotions.append(0.5)
-        
+                    if emotion in NEGATIVE_EMOTIONS:
+                        metadata_emotions.append(-0.5)
+                    elif emotion in POSITIVE_EMOTIONS:
+                        metadata_emotions.append(0.5)
+        
+        # Identify coping mechanisms: memories mentioning each method
+        state["coping"] += (self._hit_matrix(features)[:, COPING_TAG_IDS] > 0).sum(axis=0)
+        
+        emotions = np.concatenate([polarities, np.asarray(metadata_emotions, dtype=np.float32)])
+        state["count"] += emotions.size
+        state["total"] += float(emotions.sum(dtype=np.float64))
+        state["total_sq"] += float(np.square(emotions, dtype=np.float64).sum())
+    
+    def _finalize_emotional_patterns(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Emotional stability, stress triggers and coping mechanisms"""
         # Calculate emotional stability (inverse of variance)
-        emotion_variance = np.var(emotions) if emotions else 0.5
-        stability = max(0.0, min(1.0, 1.0 - emotion_variance))
+        if state["count"]:
+            mean = state["total"] / state["count"]
+            emotion_variance = max(0.0, state["total_sq"] / state["count"] - mean * mean)
+        else:
+            emotion_variance = 0.5
+        stability = float(np.clip(1.0 - emotion_variance, 0.0, 1.0))
         
+        triggers = state["triggers"]
         return {
             "stability": stability,
             "triggers": list(sorted(triggers.keys(), key=triggers.get, reverse=True)[:3]),
-            "coping": list(sorted(coping_methods.keys(), key=coping_methods.get, reverse=True)[:3])
+            "coping": _top_labels(COPING_METHODS, state["coping"], 3)
         }
     
-    async def _analyze_work_preferences(self, memories: List[Memory]) -> Dict[str, Any]:
-        """Analyze work style and preferences"""
-        collaborative_keywords = ["team", "together", "collaborate", "meeting", "discuss", "we"]
-        independent_keywords = ["alone", "myself", "independent", "solo", "own"]
-        
-        time_references = {
-            "morning": ["morning", "am", "early", "breakfast"],
-            "afternoon": ["afternoon", "lunch", "noon"],
-            "evening": ["evening", "pm", "night", "dinner"],
-            "late_night": ["midnight", "late night", "2am", "3am"]
+    def _update_work_preferences(
+        self,
+        state: Dict[str, Any],
+        contents: List[str],
+        features: List[Tuple[np.ndarray, float]]
+    ) -> None:
+        """Accumulate productivity times from a batch of memories"""
+        # Productivity times: time references in memories that talk about getting work done
+        productive = np.fromiter(
+            ("productive" in content or "work" in content or "complete" in content for content in contents),
+            dtype=bool,
+            count=len(contents)
+        )
+        time_mentions = self._hit_matrix(features)[:, TIME_TAG_IDS] > 0
+        state["productivity_times"] += (time_mentions & productive[:, None]).sum(axis=0)
+    
+    def _finalize_work_preferences(self, state: Dict[str, Any], keyword_totals: Counter) -> Dict[str, Any]:
+        """Work style, peak hours and preferred task types"""
+        # Work style and task types
+        work_style_scores = {
+            style: keyword_totals[("work_style", style)]
+            for style in ("collaborative", "independent")
         }
-        
-        task_types = {
-            "creative": ["create", "design", "innovate", "imagine", "brainstorm"],
-            "analytical": ["analyze", "data", "calculate", "measure", "evaluate"],
-            "social": ["meet", "present", "communicate", "network", "collaborate"],
-            "administrative": ["organize", "schedule", "document", "report", "manage"]
+        task_preferences = {
+            task_type: keyword_totals[("task", task_type)]
+            for task_type in TASK_TYPES
+            if keyword_totals[("task", task_type)] > 0
         }
         
-        work_style_scores = {"collaborative": 0, "independent": 0}
-        productivity_times = defaultdict(int)
-        task_preferences = defaultdict(int)
-        
-        for memory in memories:
-            content = memory.content.lower()
-            
-            # Work style
-            collab_count = sum(1 for word in collaborative_keywords if word in content)
-            indep_count = sum(1 for word in independent_keywords if word in content)
-            
-            work_style_scores["collaborative"] += collab_count
-            work_style_scores["independent"] += indep_count
-            
-            # Productivity times
-            for time_period, keywords in time_references.items():
-                if any(keyword in content for keyword in keywords):
-                    if "productive" in content or "work" in content or "complete" in content:
-                        productivity_times[time_period] += 1
-            
-            # Task types
-            for task_type, keywords in task_types.items():
-                matches = sum(1 for word in keywords if word in content)
-                if matches > 0:
-                    task_preferences[task_type] += matches
-        
         # Normalize work style
         total_style = sum(work_style_scores.values())
         if total_style > 0:
@@ -483,13 +1008,7 @@ class CognitiveProfileService:
             work_style = {"collaborative": 0.5, "independent": 0.5}
         
         # Get peak hours
-        peak_hours = [
-            time for time, count in sorted(
-                productivity_times.items(), 
-                key=lambda x: x[1], 
-                reverse=True
-            )[:2]
-        ] or ["morning"]
+        peak_hours = _top_labels(TIME_PERIODS, state["productivity_times"], 2) or ["morning"]
         
         # Get preferred tasks
         preferred_tasks = [
@@ -506,46 +1025,30 @@ class CognitiveProfileService:
             "task_types": preferred_tasks
         }
     
-    async def _analyze_social_preferences(self, memories: List[Memory]) -> Dict[str, Any]:
-        """Analyze social preferences and patterns"""
-        social_energy_indicators = {
-            "extrovert": ["party", "social", "group", "crowd", "networking", "energized"],
-            "introvert": ["alone", "quiet", "recharge", "solitude", "small group", "one-on-one"]
-        }
-        
-        relationship_indicators = {
-            "deep": ["close friend", "best friend", "deep conversation", "meaningful", "trust"],
-            "broad": ["networking", "acquaintance", "meet new", "social circle", "connections"]
-        }
-        
-        energy_score = 0.5
-        depth_score = 0.5
-        
-        for memory in memories:
-            content = memory.content.lower()
-            
+    def _update_social_preferences(self, state: Dict[str, Any], features: List[Tuple[np.ndarray, float]]) -> None:
+        """Accumulate social preferences from a batch of memory features"""
+        for hits, _ in features:
             # Social energy
-            extro_count = sum(1 for word in social_energy_indicators["extrovert"] if word in content)
-            intro_count = sum(1 for word in social_energy_indicators["introvert"] if word in content)
+            extro_count = hits[TAG_IDS[("social_energy", "extrovert")]]
+            intro_count = hits[TAG_IDS[("social_energy", "introvert")]]
             
             if extro_count > intro_count:
-                energy_score = min(1.0, energy_score + 0.05)
+                state["energy"] = min(1.0, state["energy"] + 0.05)
             elif intro_count > extro_count:
-                energy_score = max(0.0, energy_score - 0.05)
+                state["energy"] = max(0.0, state["energy"] - 0.05)
             
             # Relationship depth
-            deep_count = sum(1 for word in relationship_indicators["deep"] if word in content)
-            broad_count = sum(1 for word in relationship_indicators["broad"] if word in content)
+            deep_count = hits[TAG_IDS[("relationship", "deep")]]
+            broad_count = hits[TAG_IDS[("relationship", "broad")]]
             
             if deep_count > broad_count:
-                depth_score = min(1.0, depth_score + 0.05)
+                state["depth"] = min(1.0, state["depth"] + 0.05)
             elif broad_count > deep_count:
-                depth_score = max(0.0, depth_score - 0.05)
-        
-        return {
-            "energy": energy_score,
-            "depth": depth_score
-        }
+                state["depth"] = max(0.0, state["depth"] - 0.05)
+    
+    def _finalize_social_preferences(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Social energy and relationship depth"""
+        return dict(state)
     
     async def _incremental_profile_update(
         self,
@@ -554,20 +1057,19 @@ class CognitiveProfileService:
         profile: CognitiveProfile
     ) -> Dict[str, Any]:
         """Update profile based on recent memories only"""
-        # Get memories since last update
-        last_update = profile.last_updated
-        result = await db.execute(
-            select(Memory)
-            .where(
-                and_(
-                    Memory.user_id == user_id,
-                    Memory.created_at > last_update
-                )
-            )
-        )
-        new_memories = result.scalars().all()
+        since_last_update = Memory.created_at > profile.last_updated
+        if db.bind.dialect.name == "postgresql":
+            # Count and score memories since last update in the database
+            new_memory_count, keyword_net = await self._personality_votes(db, user_id, since_last_update)
+            
+            # Sentiment of the new memories votes on neuroticism as in a full analysis
+            sentiment_net = await self._sentiment_votes(db, user_id, since_last_update) if new_memory_count else 0
+            personality = {"keyword_net": keyword_net, "sentiment_net": sentiment_net}
+        else:
+            # The keyword votes need Postgres regexes; score the new memories here instead
+            new_memory_count, personality = await self._scan_personality(db, user_id, since_last_update)
         
-        if not new_memories:
+        if not new_memory_count:
             return {
                 "status": "no_new_data",
                 "message": "No new memories to analyze"
@@ -577,7 +1079,7 @@ class CognitiveProfileService:
         # This is a simplified version - in production, you'd weight
         # new data against existing profile
         
-        new_traits = await self._analyze_personality(new_memories)
+        new_traits = self._finalize_personality(personality)
         
         # Blend with existing traits (weighted average)
         weight_old = 0.8
@@ -593,16 +1095,17 @@ class CognitiveProfileService:
         for key, value in updates.items():
             setattr(profile, key, value)
         
-        profile.data_points += len(new_memories)
+        profile.data_points += new_memory_count
         profile.analysis_count += 1
         
         await db.commit()
         await db.refresh(profile)
+        self._invalidate_profile_views(user_id)
         
         return {
             "status": "success",
             "update_type": "incremental",
-            "new_memories_analyzed": len(new_memories),
+            "new_memories_analyzed": new_memory_count,
             "profile": self._serialize_profile(profile)
         }
     
@@ -613,11 +1116,25 @@ class CognitiveProfileService:
         if data_points == 0:
             return 0.0
         
-        confidence = min(0.95, np.log(data_points + 1) / 10)
-        return round(confidence, 2)
+        return min(0.95, log1p(data_points) * 0.1)
+    
+    def _profile_version(self, profile: CognitiveProfile) -> Tuple[int, Optional[datetime]]:
+        """Version of a profile's contents; changes on every analysis or edit"""
+        return (profile.analysis_count, profile.last_updated)
+    
+    def _invalidate_profile_views(self, user_id: uuid.UUID) -> None:
+        """Drop cached serialized profile, dominant traits and insights for a user"""
+        self._serialize_cache.pop(user_id, None)
+        self._dominant_traits_cache.pop(user_id, None)
+        self._insights_cache.pop(user_id, None)
     
     def _get_dominant_traits(self, profile: CognitiveProfile) -> List[Dict[str, Any]]:
-        """Get the most prominent traits of the user"""
+        """Get the most prominent traits of the user (cached until the profile changes)"""
+        version = self._profile_version(profile)
+        cached = self._dominant_traits_cache.get(profile.user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
         traits = []
         
         # Personality
@@ -665,11 +1182,17 @@ class CognitiveProfileService:
                 "strength": 1 - profile.analytical_vs_intuitive
             })
         
+        self._dominant_traits_cache[profile.user_id] = (version, traits)
         return traits
     
     def _serialize_profile(self, profile: CognitiveProfile) -> Dict[str, Any]:
-        """Convert profile to dictionary for API response"""
-        return {
+        """Convert profile to dictionary for API response (cached until the profile changes)"""
+        version = self._profile_version(profile)
+        cached = self._serialize_cache.get(profile.user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        serialized = {
             "personality": {
                 "openness": profile.openness,
                 "conscientiousness": profile.conscientiousness,
@@ -714,6 +1237,8 @@ class CognitiveProfileService:
                 "analysis_count": profile.analysis_count
             }
         }
+        self._serialize_cache[profile.user_id] = (version, serialized)
+        return serialized
     
     async def get_profile_insights(
         self,
@@ -729,22 +1254,25 @@ class CognitiveProfileService:
                 "message": "Profile not yet analyzed"
             }
         
-        insights = []
-        
-        # Personality insights
-        if profile.openness > 0.7:
-            insights.append({
-                "type": "personality",
-                "insight": "You're highly open to new experiences. Consider exploring creative projects or learning new skills.",
-                "recommendations": ["Try new technologies", "Explore creative hobbies", "Travel to new places"]
-            })
-        
-        if profile.conscientiousness > 0.7:
-            insights.append({
-                "type": "personality",
-                "insight": "Your high conscientiousness makes you reliable and organized. Use this strength for complex projects.",
-                "recommendations": ["Lead project planning", "Create systematic workflows", "Mentor others in organization"]
-            })
+        return {
+            "profile": self._serialize_profile(profile),
+            "insights": self._get_insights(profile),
+            "dominant_traits": self._get_dominant_traits(profile)
+        }
+    
+    def _get_insights(self, profile: CognitiveProfile) -> List[Dict[str, Any]]:
+        """Build actionable insights for a profile (cached until the profile changes)"""
+        version = self._profile_version(profile)
+        cached = self._insights_cache.get(profile.user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        # Personality and social insights
+        insights = [
+            dict(insight)
+            for attr, compare, threshold, insight in INSIGHT_RULES
+            if compare(getattr(profile, attr), threshold)
+        ]
         
         # Work insights
         if profile.peak_productivity_hours:
@@ -755,14 +1283,6 @@ class CognitiveProfileService:
                 "recommendations": [f"Block {peak_time} for deep work", "Schedule meetings outside peak hours"]
             })
         
-        # Social insights
-        if profile.social_energy < 0.3:
-            insights.append({
-                "type": "social",
-                "insight": "You prefer smaller, intimate settings. Honor this preference for better well-being.",
-                "recommendations": ["Schedule regular alone time", "Prefer one-on-one meetings", "Create quiet workspaces"]
-            })
-        
         # Stress management
         if profile.stress_triggers and profile.coping_mechanisms:
             insights.append({
@@ -771,8 +1291,11 @@ class CognitiveProfileService:
                 "recommendations": [f"Use {coping} when stressed" for coping in profile.coping_mechanisms[:2]]
             })
         
-        return {
-            "profile": self._serialize_profile(profile),
-            "insights": insights,
-            "dominant_traits": self._get_dominant_traits(profile)
-        }
\ No newline at end of file
+        self._insights_cache[profile.user_id] = (version, insights)
+        return insights
+
+
+@lru_cache(maxsize=None)
+def get_cognitive_profile_service() -> CognitiveProfileService:
+    """Shared CognitiveProfileService instance"""
+    return CognitiveProfileService()
@@ -1,16 +1,328 @@
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
+import asyncio
 import numpy as np
 from sentence_transformers import SentenceTransformer
+from cachetools import LRUCache
 import torch
-from sklearn.metrics.pairwise import cosine_similarity
 import json
 import logging
+import os
 from datetime import datetime
 
+# ONNX Runtime with int8 weights for CPU-only deployments; PyTorch without it
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Where quantized ONNX exports are written once and reused across restarts
+ONNX_MODEL_DIR = os.getenv("EMBEDDING_ONNX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mini_me", "onnx"))
+ONNX_MODEL_FILE = "model_quantized.onnx"
+
+# Token limit applied by sentence-transformers for all-MiniLM-L6-v2
+ONNX_MAX_SEQ_LENGTH = 256
+
+# Concurrent encode requests are coalesced into one model call of up to
+# ENCODE_MAX_BATCH texts, waiting at most ENCODE_MAX_WAIT seconds for company
+ENCODE_MAX_BATCH = 32
+ENCODE_MAX_WAIT = 0.005
+
+# Entity types whose values are folded into a memory's embedding text
+EMBEDDED_ENTITY_TYPES = frozenset({"person", "place", "activity"})
+
+# Strongest relationships kept per memory
+RELATIONSHIP_TOP_K = 10
+
+# Query embeddings kept for repeated searches, keyed by normalized query text
+QUERY_CACHE_SIZE = 10_000
+
+# Candidate pools at least this large are scored on the GPU when one is available
+GPU_SEARCH_MIN_CANDIDATES = 10_000
+
+# Shortlist this many times top_k by binary codes before exact rescoring; 10x
+# keeps the top 10 relationships of a memory within a 100-row float32 rescore
+BINARY_OVERSAMPLE = 10
+
+# Number of set bits in every byte value
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+# Loaded models shared by every EmbeddingService, keyed by (model name, device)
+_MODEL_CACHE: Dict[Tuple[str, str], SentenceTransformer] = {}
+
+
+def _load_model(model_name: str, device: str) -> SentenceTransformer:
+    """
+    Load a sentence transformer once per process and prepare it for inference.
+    
+    Args:
+        model_name: Name of the sentence transformer model to use
+        device: Device to run the model on
+        
+    Returns:
+        The shared, inference-ready model
+    """
+    key = (model_name, device)
+    model = _MODEL_CACHE.get(key)
+    if model is not None:
+        return model
+    
+    logger.info(f"Loading embedding model {model_name} on {device}")
+    model = SentenceTransformer(model_name, device=device)
+    
+    # Fused attention kernels that skip padding tokens (needs optimum; newer
+    # transformers releases already use scaled_dot_product_attention)
+    transformer = model._first_module()
+    try:
+        transformer.auto_model = transformer.auto_model.to_bettertransformer()
+    except Exception as e:
+        logger.info(f"BetterTransformer not applied to {model_name}: {e}")
+    
+    # Run inference in reduced precision where the hardware has fast kernels for it
+    if device == 'cuda':
+        torch.set_float32_matmul_precision('high')
+        model = model.half()
+    elif getattr(torch.cpu, "_is_amx_tile_supported", lambda: False)():
+        model = model.to(dtype=torch.bfloat16)
+    
+    model.eval()
+    _MODEL_CACHE[key] = model
+    return model
+
+
+# Quantized ONNX models keyed by model name (None when the export failed)
+_ONNX_CACHE: Dict[str, Optional[Tuple[Any, Any]]] = {}
+
+
+def _load_onnx_model(model_name: str) -> Optional[Tuple[Any, Any]]:
+    """
+    Export a model to ONNX with dynamic int8 quantization, once per machine.
+    
+    Args:
+        model_name: Name of the sentence transformer model to use
+        
+    Returns:
+        (tokenizer, ONNX Runtime model), or None if the export is unavailable
+    """
+    if model_name in _ONNX_CACHE:
+        return _ONNX_CACHE[model_name]
+    
+    model_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    save_dir = os.path.join(ONNX_MODEL_DIR, model_id.replace("/", "--"))
+    onnx = None
+    try:
+        if not os.path.exists(os.path.join(save_dir, ONNX_MODEL_FILE)):
+            logger.info(f"Exporting embedding model {model_id} to int8 ONNX in {save_dir}")
+            exported = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+            exported.save_pretrained(save_dir)
+            AutoTokenizer.from_pretrained(model_id).save_pretrained(save_dir)
+            ORTQuantizer.from_pretrained(exported).quantize(
+                save_dir=save_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            )
+        
+        logger.info(f"Loading embedding model {model_id} with ONNX Runtime")
+        onnx = (
+            AutoTokenizer.from_pretrained(save_dir),
+            ORTModelForFeatureExtraction.from_pretrained(save_dir, file_name=ONNX_MODEL_FILE)
+        )
+    except Exception as e:
+        logger.warning(f"ONNX Runtime unavailable for {model_id}, using PyTorch: {e}")
+    
+    _ONNX_CACHE[model_name] = onnx
+    return onnx
+
+
+def quantize_binary(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Pack the sign of every dimension into bits (32x smaller than float32).
+    
+    Args:
+        embeddings: Vector of shape (d,) or matrix of shape (n, d)
+        
+    Returns:
+        uint8 codes of shape (d // 8,) or (n, d // 8)
+    """
+    return np.packbits(np.asarray(embeddings) > 0, axis=-1)
+
+
+def hamming_topk(query_code: np.ndarray, codes: np.ndarray, k: int) -> np.ndarray:
+    """
+    Find the rows of codes closest to query_code in Hamming distance.
+    
+    Args:
+        query_code: Packed binary code of shape (b,)
+        codes: Packed binary codes of shape (n, b)
+        k: Number of rows to return
+        
+    Returns:
+        Indices of the k nearest rows, in no particular order
+    """
+    distances = POPCOUNT_TABLE[np.bitwise_xor(codes, query_code)].sum(axis=1, dtype=np.int32)
+    if k >= len(distances):
+        return np.arange(len(distances))
+    return np.argpartition(distances, k)[:k]
+
+class EmbeddingIndex:
+    """Growable search index of unit-norm embeddings stored column-wise
+    
+    Ids, float32 vectors and their packed sign bits live in parallel arrays,
+    so callers can build it once and search it many times.
+    """
+    
+    def __init__(self, dimension: int, capacity: int = 16):
+        """
+        Create an empty index.
+        
+        Args:
+            dimension: Length of every embedding
+            capacity: Rows to allocate up front; doubled whenever it runs out
+        """
+        self.dimension = dimension
+        self.ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._matrix = np.empty((max(capacity, 1), dimension), dtype=np.float32)
+        self._codes = np.empty((max(capacity, 1), (dimension + 7) // 8), dtype=np.uint8)
+        
+        # fp16 copy of _matrix on a GPU, uploaded on first use and kept in step by add()
+        self._device_matrix: Optional[torch.Tensor] = None
+        self._device: Optional[str] = None
+    
+    @classmethod
+    def from_pairs(cls, embeddings: List[Tuple[str, List[float]]], dimension: int) -> "EmbeddingIndex":
+        """
+        Build an index from (id, embedding) pairs, skipping missing embeddings.
+        
+        Args:
+            embeddings: List of (id, embedding) tuples
+            dimension: Length of every embedding
+            
+        Returns:
+            Index holding every non-empty embedding
+        """
+        kept = [(id, embedding) for id, embedding in embeddings if embedding is not None and len(embedding)]
+        index = cls(dimension, capacity=len(kept))
+        if kept:
+            count = len(kept)
+            index._matrix[:count] = [embedding for _, embedding in kept]
+            index._codes[:count] = quantize_binary(index._matrix[:count])
+            index.ids = [id for id, _ in kept]
+            index._positions = {id: row for row, id in enumerate(index.ids)}
+        return index
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @property
+    def matrix(self) -> np.ndarray:
+        """(N, d) float32 view of the stored embeddings"""
+        return self._matrix[:len(self.ids)]
+    
+    @property
+    def codes(self) -> np.ndarray:
+        """(N, d // 8) packed sign bits of the stored embeddings"""
+        return self._codes[:len(self.ids)]
+    
+    def add(self, id: str, embedding: List[float]) -> None:
+        """
+        Append one embedding, growing the buffers geometrically like a list.
+        
+        Args:
+            id: Identifier returned by searches
+            embedding: Unit-norm embedding vector
+        """
+        row = len(self.ids)
+        if row == len(self._matrix):
+            capacity = 2 * len(self._matrix)
+            self._matrix = np.resize(self._matrix, (capacity, self.dimension))
+            self._codes = np.resize(self._codes, (capacity, self._codes.shape[1]))
+        self._matrix[row] = embedding
+        self._codes[row] = quantize_binary(self._matrix[row])
+        self.ids.append(id)
+        self._positions[id] = row
+        
+        # Extend the device copy by the new row instead of re-uploading everything
+        if self._device_matrix is not None:
+            if row == len(self._device_matrix):
+                grown = self._device_matrix.new_empty((len(self._matrix), self.dimension))
+                grown[:row] = self._device_matrix
+                self._device_matrix = grown
+            self._device_matrix[row] = torch.from_numpy(self._matrix[row])
+    
+    def device_matrix(self, device: str) -> torch.Tensor:
+        """
+        (N, d) fp16 copy of the stored embeddings on a device, uploaded once.
+        
+        Args:
+            device: Torch device to hold the copy
+            
+        Returns:
+            Device tensor of the stored embeddings
+        """
+        if self._device_matrix is None or self._device != device:
+            self._device_matrix = torch.from_numpy(self._matrix).to(device, dtype=torch.float16)
+            self._device = device
+        return self._device_matrix[:len(self.ids)]
+    
+    def position(self, id: Optional[str]) -> Optional[int]:
+        """Row of an id in the index, or None if it is not stored"""
+        return self._positions.get(id)
+    
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        threshold: float = 0.5,
+        top_k: Optional[int] = None,
+        exclude_id: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Find stored embeddings similar to a query embedding.
+        
+        Args:
+            query_embedding: Unit-norm query embedding
+            threshold: Minimum similarity threshold
+            top_k: Return only top K results
+            exclude_id: Stored id to leave out of the results
+            
+        Returns:
+            List of (id, similarity_score) tuples sorted by similarity
+        """
+        query_vec = np.asarray(query_embedding, dtype=np.float32)
+        
+        # Rows to score: everything but the excluded id
+        rows = np.arange(len(self.ids))
+        excluded = self.position(exclude_id)
+        if excluded is not None:
+            rows = np.delete(rows, excluded)
+        
+        # Shortlist by sign-bit Hamming distance, then rescore only those exactly
+        if top_k and len(rows) > top_k * BINARY_OVERSAMPLE:
+            rows = rows[hamming_topk(quantize_binary(query_vec), self._codes[rows], top_k * BINARY_OVERSAMPLE)]
+        
+        # Rows are unit-norm, so one matrix-vector product gives every cosine
+        similarities = self._matrix[rows] @ query_vec
+        candidates = np.flatnonzero(similarities >= threshold)
+        
+        # Select the top K without sorting every candidate
+        if top_k and top_k < len(candidates):
+            candidates = candidates[np.argpartition(similarities[candidates], -top_k)[-top_k:]]
+        
+        # Sort by similarity score
+        candidates = candidates[np.argsort(-similarities[candidates], kind="stable")]
+        
+        return [(self.ids[rows[i]], float(similarities[i])) for i in candidates]
+
 class EmbeddingService:
-    """Service for creating and managing vector embeddings for semantic search"""
+    """Service for creating and managing vector embeddings for semantic search
+    
+    Embeddings are L2-normalized when created, so cosine similarity between
+    stored vectors is a plain dot product.
+    """
     
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
         """
@@ -20,11 +332,119 @@ class EmbeddingService:
             model_name: Name of the sentence transformer model to use
         """
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        logger.info(f"Loading embedding model {model_name} on {self.device}")
-        self.model = SentenceTransformer(model_name, device=self.device)
-        self.embedding_dimension = self.model.get_sentence_embedding_dimension()
         
-    def create_embedding(self, text: str) -> List[float]:
+        # CPU deployments run a quantized ONNX export when optimum is installed
+        self.onnx = _load_onnx_model(model_name) if ONNX_AVAILABLE and self.device == 'cpu' else None
+        if self.onnx is not None:
+            self.model = None
+            self.embedding_dimension = self.onnx[1].config.hidden_size
+        else:
+            self.model = _load_model(model_name, self.device)
+            self.embedding_dimension = self.model.get_sentence_embedding_dimension()
+        
+        # Micro-batching queue, started lazily on the first request's event loop
+        self._encode_queue: Optional[asyncio.Queue] = None
+        self._encode_worker: Optional[asyncio.Task] = None
+        self._encode_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self._query_cache = LRUCache(maxsize=QUERY_CACHE_SIZE)
+    
+    def _encode(self, texts):
+        """
+        Run the model without autograd and return unit-norm float32 numpy output.
+        
+        Args:
+            texts: A text or list of texts to embed
+            
+        Returns:
+            float32 array of shape (d,) for one text or (n, d) for a list
+        """
+        if self.onnx is not None:
+            return self._encode_onnx(texts)
+        
+        with torch.inference_mode():
+            # Tensors first: numpy has no bfloat16, so cast up before converting
+            embeddings = self.model.encode(texts, convert_to_tensor=True, normalize_embeddings=True)
+        return embeddings.float().cpu().numpy()
+    
+    def _encode_onnx(self, texts):
+        """
+        Embed with the ONNX model: mean-pool token states, then L2-normalize.
+        
+        Args:
+            texts: A text or list of texts to embed
+            
+        Returns:
+            float32 array of shape (d,) for one text or (n, d) for a list
+        """
+        tokenizer, model = self.onnx
+        single = isinstance(texts, str)
+        inputs = tokenizer(
+            [texts] if single else texts,
+            padding=True,
+            truncation=True,
+            max_length=ONNX_MAX_SEQ_LENGTH,
+            return_tensors="np"
+        )
+        hidden = model(**inputs).last_hidden_state
+        
+        # Same pooling and normalization as the sentence-transformers pipeline
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        embeddings = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        embeddings = embeddings.astype(np.float32, copy=False)
+        return embeddings[0] if single else embeddings
+    
+    async def _encode_batched(self, text: str) -> np.ndarray:
+        """
+        Queue a text for the next coalesced model call and wait for its embedding.
+        
+        Args:
+            text: The text to embed
+            
+        Returns:
+            Unit-norm float32 embedding vector
+        """
+        loop = asyncio.get_running_loop()
+        if self._encode_loop is not loop or self._encode_worker.done():
+            self._encode_queue = asyncio.Queue()
+            self._encode_worker = loop.create_task(self._run_encode_batches(self._encode_queue))
+            self._encode_loop = loop
+        
+        future = loop.create_future()
+        await self._encode_queue.put((text, future))
+        return await future
+    
+    async def _run_encode_batches(self, queue: asyncio.Queue):
+        """Collect queued texts into batches and encode each batch in one model call."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + ENCODE_MAX_WAIT
+            while len(batch) < ENCODE_MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                # Encode off the event loop so requests keep queueing meanwhile
+                embeddings = await asyncio.to_thread(self._encode, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            # Hand out owned rows; a view would keep the whole batch array alive
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding.copy())
+        
+    async def create_embedding(self, text: str) -> np.ndarray:
         """
         Create an embedding vector for a given text.
         
@@ -32,16 +452,15 @@ class EmbeddingService:
             text: The text to embed
             
         Returns:
-            List of floats representing the embedding vector
+            Unit-norm float32 array representing the embedding vector (zeros for empty text)
         """
         if not text or not text.strip():
-            return [0.0] * self.embedding_dimension
+            return np.zeros(self.embedding_dimension, dtype=np.float32)
             
-        # Create embedding
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        # Create embedding, sharing a model call with concurrent requests
+        return await self._encode_batched(text)
     
-    def create_batch_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def create_batch_embeddings(self, texts: List[str]) -> np.ndarray:
         """
         Create embeddings for multiple texts at once.
         
@@ -49,32 +468,35 @@ class EmbeddingService:
             texts: List of texts to embed
             
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dimension), one row per text
         """
-        if not texts:
-            return []
+        result = np.zeros((len(texts), self.embedding_dimension), dtype=np.float32)
             
         # Filter out empty texts
-        valid_texts = [text for text in texts if text and text.strip()]
-        if not valid_texts:
-            return [[0.0] * self.embedding_dimension] * len(texts)
+        valid = np.fromiter((bool(text and text.strip()) for text in texts), dtype=bool, count=len(texts))
+        if not valid.any():
+            return result
             
-        # Create embeddings
-        embeddings = self.model.encode(valid_texts, convert_to_numpy=True)
-        
-        # Map back to original indices
-        result = []
-        valid_idx = 0
-        for text in texts:
-            if text and text.strip():
-                result.append(embeddings[valid_idx].tolist())
-                valid_idx += 1
-            else:
-                result.append([0.0] * self.embedding_dimension)
+        # Create embeddings and scatter them back in one step; empty texts keep a zero row
+        result[valid] = self._encode([text for text, keep in zip(texts, valid) if keep])
                 
         return result
     
-    def create_memory_embedding(self, memory_content: str, metadata: Dict[str, Any]) -> List[float]:
+    def serialize_for_db(self, embedding: Optional[np.ndarray]) -> Optional[List[float]]:
+        """
+        Convert an embedding to the form stored in Memory.embedding.
+        
+        Args:
+            embedding: Embedding vector returned by this service
+            
+        Returns:
+            List of floats for the pgvector column, or None when there is no embedding
+        """
+        if embedding is None:
+            return None
+        return np.asarray(embedding, dtype=np.float32).tolist()
+    
+    async def create_memory_embedding(self, memory_content: str, metadata: Dict[str, Any]) -> np.ndarray:
         """
         Create an enhanced embedding for a memory by combining content and metadata.
         
@@ -89,25 +511,26 @@ class EmbeddingService:
         enhanced_text_parts = [memory_content]
         
         # Add entities to enhance semantic understanding
-        if metadata.get("entities"):
-            for entity in metadata["entities"]:
-                if entity["type"] in ["person", "place", "activity"]:
-                    enhanced_text_parts.append(f'{entity["type"]}: {entity["value"]}')
+        enhanced_text_parts += (
+            f'{entity["type"]}: {entity["value"]}'
+            for entity in metadata.get("entities") or ()
+            if entity["type"] in EMBEDDED_ENTITY_TYPES
+        )
         
         # Add emotions for emotional context
-        if metadata.get("emotions"):
-            enhanced_text_parts.append(f'emotions: {", ".join(metadata["emotions"])}')
+        emotions = metadata.get("emotions")
+        if emotions:
+            enhanced_text_parts.append(f'emotions: {", ".join(emotions)}')
         
         # Add time context if available
-        if metadata.get("time_info") and metadata["time_info"].get("has_time"):
-            time_str = metadata["time_info"].get("original", "")
-            if time_str:
-                enhanced_text_parts.append(f'time: {time_str}')
+        time_info = metadata.get("time_info") or {}
+        if time_info.get("has_time") and time_info.get("original"):
+            enhanced_text_parts.append(f'time: {time_info["original"]}')
         
         # Combine all parts
         enhanced_text = " | ".join(enhanced_text_parts)
         
-        return self.create_embedding(enhanced_text)
+        return await self.create_embedding(enhanced_text)
     
     def calculate_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
@@ -120,63 +543,92 @@ class EmbeddingService:
         Returns:
             Similarity score between 0 and 1
         """
-        if not embedding1 or not embedding2:
+        if embedding1 is None or embedding2 is None or not len(embedding1) or not len(embedding2):
             return 0.0
             
         # Convert to numpy arrays
-        vec1 = np.array(embedding1).reshape(1, -1)
-        vec2 = np.array(embedding2).reshape(1, -1)
+        vec1 = np.asarray(embedding1, dtype=np.float32)
+        vec2 = np.asarray(embedding2, dtype=np.float32)
         
-        # Calculate cosine similarity
-        similarity = cosine_similarity(vec1, vec2)[0][0]
+        # Both vectors are unit-norm, so the dot product is the cosine
+        similarity = float(vec1 @ vec2)
         
         # Ensure similarity is between 0 and 1
-        return max(0.0, min(1.0, float(similarity)))
+        return max(0.0, min(1.0, similarity))
     
     def find_similar_embeddings(
         self,
         query_embedding: List[float],
-        embeddings: List[Tuple[str, List[float]]],
+        embeddings: Union[EmbeddingIndex, List[Tuple[str, List[float]]]],
         threshold: float = 0.5,
-        top_k: Optional[int] = None
+        top_k: Optional[int] = None,
+        exclude_id: Optional[str] = None
     ) -> List[Tuple[str, float]]:
         """
         Find embeddings similar to a query embedding.
         
         Args:
             query_embedding: The query embedding vector
-            embeddings: List of (id, embedding) tuples to search
+            embeddings: EmbeddingIndex, or list of (id, embedding) tuples, to search
             threshold: Minimum similarity threshold
             top_k: Return only top K results
+            exclude_id: Id to leave out of the results
             
         Returns:
             List of (id, similarity_score) tuples sorted by similarity
         """
-        if not query_embedding or not embeddings:
+        if query_embedding is None or not len(query_embedding) or not embeddings:
             return []
         
-        # Calculate similarities
-        similarities = []
-        query_vec = np.array(query_embedding).reshape(1, -1)
+        # Legacy callers pass pairs; stack them into a one-off index
+        if not isinstance(embeddings, EmbeddingIndex):
+            embeddings = EmbeddingIndex.from_pairs(embeddings, self.embedding_dimension)
+            if not len(embeddings):
+                return []
         
-        for id, embedding in embeddings:
-            if embedding:
-                emb_vec = np.array(embedding).reshape(1, -1)
-                similarity = cosine_similarity(query_vec, emb_vec)[0][0]
-                
-                if similarity >= threshold:
-                    similarities.append((id, float(similarity)))
+        if self.device == 'cuda' and len(embeddings) >= GPU_SEARCH_MIN_CANDIDATES:
+            return self._find_similar_on_gpu(query_embedding, embeddings, threshold, top_k, exclude_id)
         
-        # Sort by similarity score
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        return embeddings.search(query_embedding, threshold, top_k, exclude_id)
+    
+    def _find_similar_on_gpu(
+        self,
+        query_embedding: List[float],
+        index: EmbeddingIndex,
+        threshold: float,
+        top_k: Optional[int],
+        exclude_id: Optional[str]
+    ) -> List[Tuple[str, float]]:
+        """
+        Score every candidate with one fp16 matrix-vector product on the GPU.
         
-        # Return top K if specified
-        if top_k:
-            return similarities[:top_k]
+        Args:
+            query_embedding: Unit-norm query embedding
+            index: Unit-norm candidate embeddings
+            threshold: Minimum similarity threshold
+            top_k: Return only top K results
+            exclude_id: Id to leave out of the results
+            
+        Returns:
+            List of (id, similarity_score) tuples sorted by similarity
+        """
+        with torch.inference_mode():
+            matrix_gpu = index.device_matrix(self.device)
+            query_gpu = torch.tensor(np.asarray(query_embedding, dtype=np.float32), device=self.device, dtype=torch.float16)
+            similarities = (matrix_gpu @ query_gpu).float()
+            
+            excluded = index.position(exclude_id)
+            if excluded is not None:
+                similarities[excluded] = float("-inf")
+            
+            # Only the selected scores travel back to the host
+            values, indices = torch.topk(similarities, min(top_k or len(index), len(index)))
+            values, indices = values.cpu().numpy(), indices.cpu().numpy()
         
-        return similarities
+        keep = values >= threshold
+        return [(index.ids[i], float(value)) for i, value in zip(indices[keep], values[keep])]
     
-    def create_query_embedding(self, query: str, context: Optional[Dict[str, Any]] = None) -> List[float]:
+    async def create_query_embedding(self, query: str, context: Optional[Dict[str, Any]] = None) -> np.ndarray:
         """
         Create an embedding for a search query with optional context enhancement.
         
@@ -203,13 +655,21 @@ class EmbeddingService:
                 for entity in context["entities"]:
                     enhanced_query += f" {entity['type']}: {entity['value']}"
         
-        return self.create_embedding(enhanced_query)
+        # The model is uncased and splits on whitespace, so these variants embed identically
+        cache_key = " ".join(enhanced_query.lower().split())
+        embedding = self._query_cache.get(cache_key)
+        if embedding is None:
+            embedding = await self.create_embedding(enhanced_query)
+            embedding.setflags(write=False)  # shared between callers
+            self._query_cache[cache_key] = embedding
+        
+        return embedding
     
     def update_memory_relationships(
         self,
         memory_id: str,
         memory_embedding: List[float],
-        all_embeddings: List[Tuple[str, List[float]]],
+        all_embeddings: Union[EmbeddingIndex, List[Tuple[str, List[float]]]],
         threshold: float = 0.7
     ) -> List[Tuple[str, float]]:
         """
@@ -218,21 +678,19 @@ class EmbeddingService:
         Args:
             memory_id: ID of the memory to find relationships for
             memory_embedding: Embedding of the memory
-            all_embeddings: All other memory embeddings
+            all_embeddings: Memory embeddings to search; may include the memory itself
             threshold: Similarity threshold for relationships
             
         Returns:
             List of (related_memory_id, strength) tuples
         """
-        # Filter out the memory itself
-        other_embeddings = [(id, emb) for id, emb in all_embeddings if id != memory_id]
-        
-        # Find similar memories
+        # Find similar memories, leaving out the memory itself
         relationships = self.find_similar_embeddings(
             memory_embedding,
-            other_embeddings,
+            all_embeddings,
             threshold=threshold,
-            top_k=10  # Limit to 10 strongest relationships
+            top_k=RELATIONSHIP_TOP_K,
+            exclude_id=memory_id
         )
         
         return relationships
@@ -255,21 +713,24 @@ class EmbeddingService:
         if not embeddings or len(embeddings) < n_clusters:
             return {0: [id for id, _ in embeddings]}
         
-        from sklearn.cluster import KMeans
+        from sklearn.cluster import MiniBatchKMeans
         
-        # Extract embedding vectors
+        # Extract embedding vectors into one contiguous float32 buffer
         ids = [id for id, _ in embeddings]
-        vectors = np.array([emb for _, emb in embeddings])
+        vectors = np.empty((len(embeddings), self.embedding_dimension), dtype=np.float32)
+        for row, (_, emb) in enumerate(embeddings):
+            vectors[row] = emb
         
         # Perform clustering
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=1024, n_init='auto', random_state=42)
         cluster_labels = kmeans.fit_predict(vectors)
         
-        # Group by cluster
+        # Group by cluster: sort once, then split at the cluster sizes
+        order = np.argsort(cluster_labels, kind="stable")
+        bounds = np.cumsum(np.bincount(cluster_labels, minlength=n_clusters))[:-1]
         clusters = {}
-        for idx, cluster_id in enumerate(cluster_labels):
-            if cluster_id not in clusters:
-                clusters[cluster_id] = []
-            clusters[cluster_id].append(ids[idx])
+        for cluster_id, members in enumerate(np.split(order, bounds)):
+            if len(members):
+                clusters[cluster_id] = [ids[idx] for idx in members]
         
         return clusters
\ No newline at end of file
@@ -1,10 +1,158 @@
 import re
 import random
+import ahocorasick
+from functools import lru_cache
 from datetime import datetime, timedelta, date
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple
 import json
 from dateutil import parser as date_parser
 from dateutil.relativedelta import relativedelta
+from cachetools import LRUCache
+
+# Message analyses kept for repeated inputs ("what?", greetings, retries)
+ANALYSIS_CACHE_SIZE = 2048
+
+# Intent scores are capped at 1.0 and ties go to the earlier intent, so once an
+# intent reaches the cap the remaining intents can't win and aren't scored
+DECISIVE_INTENT_SCORE = 1.0
+
+# Entity / time extractions kept per message text
+EXTRACTION_CACHE_SIZE = 4096
+
+
+# Day / month numbers for resolving "last friday", "on march 3" and the like
+WEEKDAYS = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6
+}
+MONTHS = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4,
+    'may': 5, 'june': 6, 'july': 7, 'august': 8,
+    'september': 9, 'october': 10, 'november': 11, 'december': 12
+}
+
+# Entity patterns (capture group 1 holds the value when present); tuples
+# are fixed word lists matched as whole words by an automaton
+ENTITY_PATTERN_SOURCES = {
+    "person": [
+        r"\b(?:with |met |saw |talked to |called |texted |emailed |visited )([A-Z][a-z]+(?: [A-Z][a-z]+)*)",
+        r"\b([A-Z][a-z]+(?: [A-Z][a-z]+)*) (?:called|texted|emailed|visited|invited) me",
+    ],
+    "place": [
+        r"\b(?:at |in |to |from )(?:the )?([A-Z][a-z]+(?: [A-Z][a-z]+)*(?:\'s)?)",
+        ("gym", "office", "home", "work", "school", "store", "restaurant", "cafe", "park", "beach", "mall", "hospital", "airport"),
+    ],
+    "activity": [
+        ("workout", "exercise", "meeting", "lunch", "dinner", "breakfast", "coffee", "run", "walk", "work", "project", "study", "read", "watch", "play"),
+        ("shopping", "cooking", "cleaning", "driving", "traveling", "sleeping", "eating", "drinking"),
+    ],
+    "emotion": [
+        ("happy", "sad", "stressed", "anxious", "excited", "overwhelmed", "tired", "energetic", "grateful", "angry", "frustrated", "calm", "peaceful"),
+        ("good", "great", "bad", "terrible", "amazing", "awful", "okay", "fine"),
+    ],
+    "quantity": [
+        r"\b(\d+)\s*(miles?|km|kilometers?|minutes?|hours?|days?|weeks?|months?|years?)\b",
+        r"\b(\d+)\s*(times?|reps?|sets?|cups?|glasses?|bottles?|pieces?)\b",
+    ]
+}
+
+
+# Canned replies generate_contextual_response picks from at random
+CONVERSATION_CONTINUATIONS = (
+    "I hear you. What else is on your mind?",
+    "That makes sense. Tell me more.",
+    "Interesting. How are you feeling about that?",
+    "Got it. Anything else you want to talk about?",
+)
+MORNING_GREETINGS = (
+    "Good morning! How did you sleep? Ready to take on the day, or still warming up to it?",
+    "Hey there! Morning person or still need that coffee? What's the plan for today?",
+    "Morning! Hope you got some good rest. What's on your mind this morning?",
+    "Hi! Starting the day early I see. Feeling energized or taking it slow?",
+)
+MORNING_RESPONSES = (
+    "Morning! What's on your agenda today? I'm here if you want to talk through your plans or just chat.",
+    "Good morning! Anything exciting happening today, or is it more of a routine kind of day?",
+    "Rise and shine! What are you looking forward to today? Or maybe dreading?",
+    "Morning vibes! How are you feeling about the day ahead?",
+)
+DEFAULT_RESPONSES = (
+    "I'm here and listening. What's going on with you right now? Whether it's something specific or you just want to chat, I'm all ears.",
+    "Hey! I'm here for whatever you need - venting, planning, remembering, or just chatting. What's up?",
+    "Thanks for checking in! What's on your mind? I'm here to listen, help you remember things, or just have a conversation.",
+    "Hi there! Feel free to share whatever's on your mind - could be about your day, your thoughts, or anything really. I'm here to listen and help.",
+    "Hey! Whether you want to talk about something specific or just see what's in your memory bank, I'm here. What would you like to do?",
+)
+
+# Reflection replies for the emotions we have something specific to say about
+EMOTION_RESPONSES = {
+    "stressed": "I understand you're feeling stressed. It's important to take breaks and practice self-care. What's the main source of stress right now?",
+    "happy": "That's wonderful to hear! Happiness is worth celebrating. What's bringing you joy today?",
+    "anxious": "I hear that you're feeling anxious. Remember to breathe deeply. Would you like to talk about what's on your mind?",
+    "tired": "Rest is important for your well-being. Have you been getting enough sleep lately?",
+    "excited": "Your excitement is contagious! What are you looking forward to?",
+    "grateful": "Gratitude is such a positive mindset. It's great that you're recognizing the good things in your life.",
+}
+
+# Conversational replies for general messages, per situation: the first
+# pattern found in the lowercased message picks the reply (a string, or a pool
+# to choose from at random). Patterns are plain substring alternations, so
+# "hi" matches inside "this"; the empty pattern always matches.
+CONVERSATIONAL_RULES = {
+    "in_conversation": (
+        ("sleeping late", "Ah, planning to sleep in tomorrow? That's good since you're up so late now. Will you be able to with work at 9am though?"),
+        ("tired|exhausted|sleepy", "I can imagine you're tired! Being up this late when you have work tomorrow is rough. What's keeping you from heading to bed?"),
+        ("", CONVERSATION_CONTINUATIONS),
+    ),
+    "late_night": (
+        ("still up|can't sleep", "I notice you're up pretty late! What's on your mind? Sometimes talking about it helps. Are you having trouble sleeping, or just enjoying the quiet hours?"),
+        (r"\A(?s:(?=.*work).*tomorrow)", "Working tomorrow and still awake at this hour? That's going to be a tough morning. What time do you need to be up? Maybe we should think about winding down soon."),
+        ("hey|hi|hello", "Hey there! You're up late tonight. How's your evening going? Anything interesting keeping you awake?"),
+        ("", "It's pretty late - or early, depending on how you look at it! What brings you here at this hour? Feel like sharing what's on your mind?"),
+    ),
+    "morning": (
+        ("hey|hi|hello|good morning", MORNING_GREETINGS),
+        ("", MORNING_RESPONSES),
+    ),
+    "afternoon": (
+        ("hey|hi|hello", "Hey! How's your day going so far? Productive afternoon or taking it easy?"),
+        ("", "Afternoon! What's happening in your world right now? Feel free to share - whether it's work stuff, personal thoughts, or just random musings."),
+    ),
+    "evening": (
+        ("hey|hi|hello", "Hey there! How was your day? Winding down or still have things on your plate?"),
+        ("", "Evening! Perfect time to reflect on the day. What's been the highlight so far? Or maybe there's something you need to get off your chest?"),
+    ),
+}
+
+
+def _combine_patterns(patterns: List[str]) -> re.Pattern:
+    """Merge patterns into one regex whose group gN is set iff pattern N occurs.
+    
+    Each pattern sits in its own optional lookahead, so a single match() at
+    position 0 reports every pattern that re.search would find, overlapping
+    or not, in one call into the regex engine.
+    """
+    # Only the scan prefix crosses newlines; "." inside the patterns keeps its meaning
+    return re.compile(
+        "".join(f"(?:(?=(?s:.*?)(?P<g{i}>{pattern})))?" for i, pattern in enumerate(patterns)),
+        re.IGNORECASE
+    )
+
+
+def _matched_indices(combined: re.Pattern, count: int, message: str) -> List[int]:
+    """Indices of the patterns merged by _combine_patterns that occur in message"""
+    match = combined.match(message)
+    return [i for i in range(count) if match.group(f"g{i}") is not None]
+
+
+class Entity(NamedTuple):
+    """Extracted entity as held in the caches; callers get it as a dict"""
+    type: str
+    value: str
+    start: int
+    end: int
+    confidence: float = 0.9
+
 
 class EnhancedNLPService:
     """Enhanced NLP service with better intent detection and time parsing"""
@@ -67,24 +215,24 @@ class EnhancedNLPService:
             }
         }
         
-        # Time expression patterns
+        # Time expression patterns; date handlers take the match and the current day
         self.time_patterns = {
             "relative_past": [
-                (r"(today|this morning|this afternoon|this evening)", lambda m=None: date.today()),
-                (r"yesterday", lambda m=None: date.today() - timedelta(days=1)),
-                (r"(\d+) days? ago", lambda m: date.today() - timedelta(days=int(m.group(1)))),
+                (r"(today|this morning|this afternoon|this evening)", lambda m, today: today),
+                (r"yesterday", lambda m, today: today - timedelta(days=1)),
+                (r"(\d+) days? ago", lambda m, today: today - timedelta(days=int(m.group(1)))),
                 (r"last (monday|tuesday|wednesday|thursday|friday|saturday|sunday)", self._last_weekday),
-                (r"last week", lambda m=None: date.today() - timedelta(weeks=1)),
-                (r"last month", lambda m=None: date.today() - relativedelta(months=1)),
-                (r"(\d+) weeks? ago", lambda m: date.today() - timedelta(weeks=int(m.group(1)))),
-                (r"(\d+) months? ago", lambda m: date.today() - relativedelta(months=int(m.group(1)))),
+                (r"last week", lambda m, today: today - timedelta(weeks=1)),
+                (r"last month", lambda m, today: today - relativedelta(months=1)),
+                (r"(\d+) weeks? ago", lambda m, today: today - timedelta(weeks=int(m.group(1)))),
+                (r"(\d+) months? ago", lambda m, today: today - relativedelta(months=int(m.group(1)))),
             ],
             "relative_future": [
-                (r"tomorrow", lambda m=None: date.today() + timedelta(days=1)),
+                (r"tomorrow", lambda m, today: today + timedelta(days=1)),
                 (r"next (monday|tuesday|wednesday|thursday|friday|saturday|sunday)", self._next_weekday),
-                (r"next week", lambda m=None: date.today() + timedelta(weeks=1)),
-                (r"next month", lambda m=None: date.today() + relativedelta(months=1)),
-                (r"in (\d+) days?", lambda m: date.today() + timedelta(days=int(m.group(1)))),
+                (r"next week", lambda m, today: today + timedelta(weeks=1)),
+                (r"next month", lambda m, today: today + relativedelta(months=1)),
+                (r"in (\d+) days?", lambda m, today: today + timedelta(days=int(m.group(1)))),
             ],
             "specific": [
                 (r"on (january|february|march|april|may|june|july|august|september|october|november|december) (\d{1,2})", self._parse_month_day),
@@ -98,9 +246,80 @@ class EnhancedNLPService:
                 (r"tonight", ("18:00", "23:59")),
             ]
         }
+        
+        # Compile every pattern once instead of on each message; each intent's
+        # positive, negative and boost lists become one combined regex apiece
+        for config in self.intent_patterns.values():
+            config["weights"] = [weight for _, weight in config["patterns"]]
+            config["patterns"] = _combine_patterns([pattern for pattern, _ in config["patterns"]])
+            for key in ("negative_patterns", "boost_patterns"):
+                if key in config:
+                    config[key.replace("patterns", "count")] = len(config[key])
+                    config[key] = _combine_patterns(config[key])
+        
+        for patterns in self.time_patterns.values():
+            patterns[:] = [(re.compile(pattern, re.IGNORECASE), handler) for pattern, handler in patterns]
+        
+        # One combined regex reports which relative-past and time-of-day patterns occur
+        self._time_pattern_count = len(self.time_patterns["relative_past"])
+        self._time_master_count = self._time_pattern_count + len(self.time_patterns["time_of_day"])
+        self._time_master = _combine_patterns([
+            pattern.pattern
+            for key in ("relative_past", "time_of_day")
+            for pattern, _ in self.time_patterns[key]
+        ])
+        
+        # Word lists are replaced by their index into one shared automaton
+        # Flat (entity_type, compiled regex or word-list index) pairs, in source order
+        self._entity_patterns = []
+        word_lists = {}
+        list_count = 0
+        for entity_type, patterns in ENTITY_PATTERN_SOURCES.items():
+            for pattern in patterns:
+                if isinstance(pattern, tuple):
+                    for word in pattern:
+                        word_lists.setdefault(word, []).append(list_count)
+                    self._entity_patterns.append((entity_type, list_count))
+                    list_count += 1
+                else:
+                    self._entity_patterns.append((entity_type, re.compile(pattern, re.IGNORECASE)))
+        
+        # A word may sit in several lists ("work" is a place and an activity)
+        self.keyword_automaton = ahocorasick.Automaton()
+        for word, lists in word_lists.items():
+            self.keyword_automaton.add_word(word, (tuple(lists), len(word)))
+        self.keyword_automaton.make_automaton()
+        
+        self._conversational_rules = {
+            situation: tuple((re.compile(pattern), reply) for pattern, reply in rules)
+            for situation, rules in CONVERSATIONAL_RULES.items()
+        }
+        
+        self._analysis_cache = LRUCache(maxsize=ANALYSIS_CACHE_SIZE)
+        self._entity_cache = LRUCache(maxsize=EXTRACTION_CACHE_SIZE)
+        self._time_info_cache = LRUCache(maxsize=EXTRACTION_CACHE_SIZE)
     
     def analyze_message(self, message: str, previous_message: str = None, previous_intent: str = None) -> Dict[str, Any]:
         """Analyze a message with enhanced intent detection and context awareness"""
+        # Resolved dates depend on the current day, so it is part of the key
+        today = date.today()
+        key = (message, previous_message, previous_intent, today)
+        analysis = self._analysis_cache.get(key)
+        if analysis is None:
+            analysis = self._analyze_message(message, previous_message, previous_intent, today)
+            self._analysis_cache[key] = analysis
+        
+        # Fresh containers so callers can't alter the cached analysis
+        return {
+            **analysis,
+            "entities": [entity._asdict() for entity in analysis["entities"]],
+            "time_info": dict(analysis["time_info"]),
+            "all_intent_scores": dict(analysis["all_intent_scores"])
+        }
+    
+    def _analyze_message(self, message: str, previous_message: str = None, previous_intent: str = None,
+                         today: date = None) -> Dict[str, Any]:
+        """Run intent detection and entity / time extraction for analyze_message"""
         message_lower = message.lower()
         
         # Check for conversational follow-ups first
@@ -121,30 +340,16 @@ class EnhancedNLPService:
                 intent_scores = {"conversation_response": 0.8}
             else:
                 # Normal intent detection
-                intent_scores = {}
-                for intent_type, config in self.intent_patterns.items():
-                    score = self._calculate_intent_score(message_lower, config)
-                    intent_scores[intent_type] = score
-                
-                best_intent = max(intent_scores.items(), key=lambda x: x[1])
-                intent = best_intent[0] if best_intent[1] > 0.5 else "general"
-                confidence = best_intent[1] if best_intent[1] > 0.5 else 0.0
+                intent, confidence, intent_scores = self._detect_intent(message_lower)
         else:
             # Normal intent detection without context
-            intent_scores = {}
-            for intent_type, config in self.intent_patterns.items():
-                score = self._calculate_intent_score(message_lower, config)
-                intent_scores[intent_type] = score
-            
-            best_intent = max(intent_scores.items(), key=lambda x: x[1])
-            intent = best_intent[0] if best_intent[1] > 0.5 else "general"
-            confidence = best_intent[1] if best_intent[1] > 0.5 else 0.0
+            intent, confidence, intent_scores = self._detect_intent(message_lower)
         
         # Extract entities
-        entities = self.extract_entities(message)
+        entities = self._cached_entities(message, message_lower)
         
         # Extract time information
-        time_info = self.extract_time_info(message)
+        time_info = self._cached_time_info(message, message_lower, today)
         
         return {
             "intent": intent,
@@ -155,33 +360,43 @@ class EnhancedNLPService:
             "all_intent_scores": intent_scores
         }
     
+    def _detect_intent(self, message_lower: str) -> Tuple[str, float, Dict[str, float]]:
+        """Score the intents, tracking the best one as it goes; returns (intent, confidence, scores)"""
+        intent_scores = {}
+        best_intent, best_score = "general", 0.0
+        for intent_type, config in self.intent_patterns.items():
+            score = self._calculate_intent_score(message_lower, config)
+            intent_scores[intent_type] = score
+            # Strictly greater, so ties keep the earlier intent like max() did
+            if score > best_score:
+                best_intent, best_score = intent_type, score
+                if score >= DECISIVE_INTENT_SCORE:
+                    break
+        
+        if best_score > 0.5:
+            return best_intent, best_score, intent_scores
+        return "general", 0.0, intent_scores
+    
     def _calculate_intent_score(self, message: str, config: Dict) -> float:
         """Calculate intent score based on patterns"""
         score = 0.0
         matches = 0
         
         # Check positive patterns
-        for pattern_info in config["patterns"]:
-            if isinstance(pattern_info, tuple):
-                pattern, weight = pattern_info
-            else:
-                pattern, weight = pattern_info, 1.0
-            
-            if re.search(pattern, message):
-                score += weight
-                matches += 1
+        weights = config["weights"]
+        for i in _matched_indices(config["patterns"], len(weights), message):
+            score += weights[i]
+            matches += 1
         
         # Check negative patterns
         if "negative_patterns" in config:
-            for pattern in config["negative_patterns"]:
-                if re.search(pattern, message):
-                    score -= 0.3
+            for _ in _matched_indices(config["negative_patterns"], config["negative_count"], message):
+                score -= 0.3
         
         # Check boost patterns
         if "boost_patterns" in config:
-            for pattern in config["boost_patterns"]:
-                if re.search(pattern, message):
-                    score += 0.2
+            for _ in _matched_indices(config["boost_patterns"], config["boost_count"], message):
+                score += 0.2
         
         # Normalize score
         if matches > 0:
@@ -191,58 +406,87 @@ class EnhancedNLPService:
     
     def extract_entities(self, message: str) -> List[Dict[str, Any]]:
         """Extract entities with improved patterns"""
+        return [entity._asdict() for entity in self._cached_entities(message)]
+    
+    def _cached_entities(self, message: str, message_lower: str = None) -> Tuple[Entity, ...]:
+        """Entities of a message, shared between calls"""
+        entities = self._entity_cache.get(message)
+        if entities is None:
+            entities = tuple(self._extract_entities(message, message_lower))
+            self._entity_cache[message] = entities
+        return entities
+    
+    def _extract_entities(self, message: str, message_lower: str = None) -> List[Entity]:
+        """Run the entity patterns over a message, keeping the first hit per (type, value)"""
         entities = []
-        
-        # Enhanced entity patterns
-        entity_patterns = {
-            "person": [
-                r"\b(?:with |met |saw |talked to |called |texted |emailed |visited )([A-Z][a-z]+(?: [A-Z][a-z]+)*)",
-                r"\b([A-Z][a-z]+(?: [A-Z][a-z]+)*) (?:called|texted|emailed|visited|invited) me",
-            ],
-            "place": [
-                r"\b(?:at |in |to |from )(?:the )?([A-Z][a-z]+(?: [A-Z][a-z]+)*(?:\'s)?)",
-                r"\b(gym|office|home|work|school|store|restaurant|cafe|park|beach|mall|hospital|airport)\b",
-            ],
-            "activity": [
-                r"\b(workout|exercise|meeting|lunch|dinner|breakfast|coffee|run|walk|work|project|study|read|watch|play)\b",
-                r"\b(shopping|cooking|cleaning|driving|traveling|sleeping|eating|drinking)\b",
-            ],
-            "emotion": [
-                r"\b(happy|sad|stressed|anxious|excited|overwhelmed|tired|energetic|grateful|angry|frustrated|calm|peaceful)\b",
-                r"\b(good|great|bad|terrible|amazing|awful|okay|fine)\b",
-            ],
-            "quantity": [
-                r"\b(\d+)\s*(miles?|km|kilometers?|minutes?|hours?|days?|weeks?|months?|years?)\b",
-                r"\b(\d+)\s*(times?|reps?|sets?|cups?|glasses?|bottles?|pieces?)\b",
-            ]
-        }
-        
-        for entity_type, patterns in entity_patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, message, re.IGNORECASE)
-                for match in matches:
-                    value = match.group(1) if match.groups() else match.group(0)
-                    entities.append({
-                        "type": entity_type,
-                        "value": value.strip(),
-                        "start": match.start(),
-                        "end": match.end(),
-                        "confidence": 0.9
-                    })
-        
-        # Remove duplicates
         seen = set()
-        unique_entities = []
-        for entity in entities:
-            key = (entity["type"], entity["value"].lower())
-            if key not in seen:
+        keyword_spans = self._keyword_spans(message, message_lower)
+        
+        for entity_type, pattern in self._entity_patterns:
+            if isinstance(pattern, int):
+                hits = [(message[start:end], start, end) for start, end in keyword_spans.get(pattern, ())]
+            else:
+                hits = [
+                    ((match.group(1) if match.groups() else match.group(0)).strip(), match.start(), match.end())
+                    for match in pattern.finditer(message)
+                ]
+            
+            for value, start, end in hits:
+                # Skip duplicates as they are found
+                key = (entity_type, value.lower())
+                if key in seen:
+                    continue
                 seen.add(key)
-                unique_entities.append(entity)
+                entities.append(Entity(entity_type, value, start, end))
         
-        return unique_entities
+        return entities
+    
+    def _keyword_spans(self, message: str, lowered: str = None) -> Dict[int, List[Tuple[int, int]]]:
+        """Find whole-word, case-insensitive word list hits in one automaton pass
+        
+        Args:
+            message: Text to scan
+            lowered: message.lower() if the caller already has it
+        
+        Returns:
+            (start, end) spans in message, grouped by word list index
+        """
+        if lowered is None:
+            lowered = message.lower()
+        if len(lowered) != len(message):
+            # A few characters lowercase to several; keep them so offsets line up
+            lowered = "".join(char if len(char.lower()) != 1 else char.lower() for char in message)
+        
+        spans = {}
+        for last, (list_indices, length) in self.keyword_automaton.iter(lowered):
+            start, end = last - length + 1, last + 1
+            if start > 0 and (lowered[start - 1].isalnum() or lowered[start - 1] == "_"):
+                continue
+            if end < len(lowered) and (lowered[end].isalnum() or lowered[end] == "_"):
+                continue
+            for list_index in list_indices:
+                spans.setdefault(list_index, []).append((start, end))
+        return spans
     
     def extract_time_info(self, message: str) -> Dict[str, Any]:
         """Extract temporal information from message"""
+        return dict(self._cached_time_info(message))
+    
+    def _cached_time_info(self, message: str, message_lower: str = None, today: date = None) -> Dict[str, Any]:
+        """Time info of a message, shared between calls; never hand this out directly"""
+        # Resolved dates depend on the current day, so it is part of the key;
+        # it is read once here and handed to the date handlers
+        if today is None:
+            today = date.today()
+        key = (message, today)
+        time_info = self._time_info_cache.get(key)
+        if time_info is None:
+            time_info = self._extract_time_info(message, message_lower, today)
+            self._time_info_cache[key] = time_info
+        return time_info
+    
+    def _extract_time_info(self, message: str, message_lower: str = None, today: date = None) -> Dict[str, Any]:
+        """Run the time patterns over a message"""
         time_info = {
             "has_time": False,
             "time_type": None,
@@ -252,89 +496,78 @@ class EnhancedNLPService:
             "raw_expression": None
         }
         
-        message_lower = message.lower()
+        if message_lower is None:
+            message_lower = message.lower()
+        if today is None:
+            today = date.today()
+        
+        # Earlier patterns take precedence within each list, wherever they occur
+        found = _matched_indices(self._time_master, self._time_master_count, message_lower)
+        past_index = next((i for i in found if i < self._time_pattern_count), None)
+        day_index = next((i - self._time_pattern_count for i in found if i >= self._time_pattern_count), None)
         
         # Check relative past expressions
-        for pattern, handler in self.time_patterns["relative_past"]:
-            match = re.search(pattern, message_lower)
-            if match:
-                time_info["has_time"] = True
-                time_info["time_type"] = "relative_past"
-                time_info["raw_expression"] = match.group(0)
-                
-                if callable(handler):
-                    time_info["date"] = handler(match)
-                break
+        if past_index is not None:
+            # Rerun the winning pattern alone so handlers see its own groups
+            pattern, handler = self.time_patterns["relative_past"][past_index]
+            match = pattern.search(message_lower)
+            time_info["has_time"] = True
+            time_info["time_type"] = "relative_past"
+            time_info["raw_expression"] = match.group(0)
+            
+            if callable(handler):
+                time_info["date"] = handler(match, today)
         
         # Check for time of day
-        for pattern, time_range in self.time_patterns["time_of_day"]:
-            if re.search(pattern, message_lower):
-                if isinstance(time_range, tuple):
-                    time_info["time_of_day"] = time_range
-                break
+        if day_index is not None:
+            time_range = self.time_patterns["time_of_day"][day_index][1]
+            if isinstance(time_range, tuple):
+                time_info["time_of_day"] = time_range
         
         return time_info
     
-    def _last_weekday(self, match=None) -> date:
+    def _last_weekday(self, match, today: date) -> date:
         """Get the date of last occurrence of a weekday"""
         if match:
             weekday_name = match.group(1).lower()
         else:
-            return date.today() - timedelta(days=7)
+            return today - timedelta(days=7)
         
-        weekdays = {
-            'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-            'friday': 4, 'saturday': 5, 'sunday': 6
-        }
-        
-        target_weekday = weekdays.get(weekday_name, 0)
-        today = date.today()
+        target_weekday = WEEKDAYS.get(weekday_name, 0)
         days_back = (today.weekday() - target_weekday) % 7
         if days_back == 0:
             days_back = 7
         
         return today - timedelta(days=days_back)
     
-    def _next_weekday(self, match=None) -> date:
+    def _next_weekday(self, match, today: date) -> date:
         """Get the date of next occurrence of a weekday"""
         if match:
             weekday_name = match.group(1).lower()
         else:
-            return date.today() + timedelta(days=7)
-        
-        weekdays = {
-            'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-            'friday': 4, 'saturday': 5, 'sunday': 6
-        }
+            return today + timedelta(days=7)
         
-        target_weekday = weekdays.get(weekday_name, 0)
-        today = date.today()
+        target_weekday = WEEKDAYS.get(weekday_name, 0)
         days_forward = (target_weekday - today.weekday()) % 7
         if days_forward == 0:
             days_forward = 7
         
         return today + timedelta(days=days_forward)
     
-    def _parse_month_day(self, match) -> date:
+    def _parse_month_day(self, match, today: date) -> date:
         """Parse month and day"""
         month_name = match.group(1)
         day = int(match.group(2))
         
-        months = {
-            'january': 1, 'february': 2, 'march': 3, 'april': 4,
-            'may': 5, 'june': 6, 'july': 7, 'august': 8,
-            'september': 9, 'october': 10, 'november': 11, 'december': 12
-        }
-        
-        month = months.get(month_name.lower(), 1)
-        year = date.today().year
+        month = MONTHS.get(month_name.lower(), 1)
+        year = today.year
         
         try:
             return date(year, month, day)
         except:
-            return date.today()
+            return today
     
-    def _parse_date(self, match) -> date:
+    def _parse_date(self, match, today: date) -> date:
         """Parse date in various formats"""
         try:
             parts = match.groups()
@@ -345,7 +578,7 @@ class EnhancedNLPService:
             
             return date(year, int(parts[0]), int(parts[1]))
         except:
-            return date.today()
+            return today
     
     def _parse_time(self, match) -> Tuple[str, str]:
         """Parse time expression"""
@@ -363,12 +596,13 @@ class EnhancedNLPService:
     def generate_contextual_response(self, intent: str, entities: List[Dict], 
                                    memories: List[Any] = None, time_info: Dict = None, 
                                    message: str = None, previous_message: str = None,
-                                   in_conversation: bool = False) -> str:
+                                   in_conversation: bool = False, message_lower: str = None) -> str:
         """Generate more contextual and natural responses"""
         
         # Get current time for context-aware responses
         current_hour = datetime.now().hour
-        message_lower = message.lower() if message else ""
+        if message_lower is None:
+            message_lower = message.lower() if message else ""
         
         # Handle special conversation intents first
         if intent == "conversation_response":
@@ -418,10 +652,12 @@ class EnhancedNLPService:
             if emotions:
                 response += f" I can see you're feeling {emotions[0]}."
             
-            # Add contextual follow-up
-            if "gym" in str(activities).lower() or "workout" in str(activities).lower():
+            # Add contextual follow-up; activities are whole words from the
+            # entity word lists, so set membership matches the old substring test
+            activities_lower = {activity.lower() for activity in activities}
+            if "gym" in activities_lower or "workout" in activities_lower:
                 response += " Keep up the great work on your fitness!"
-            elif "meeting" in str(activities).lower():
+            elif "meeting" in activities_lower:
                 response += " Hope it was productive!"
             
             return response
@@ -453,16 +689,7 @@ class EnhancedNLPService:
             
             if emotions:
                 emotion = emotions[0].lower()
-                responses = {
-                    "stressed": "I understand you're feeling stressed. It's important to take breaks and practice self-care. What's the main source of stress right now?",
-                    "happy": "That's wonderful to hear! Happiness is worth celebrating. What's bringing you joy today?",
-                    "anxious": "I hear that you're feeling anxious. Remember to breathe deeply. Would you like to talk about what's on your mind?",
-                    "tired": "Rest is important for your well-being. Have you been getting enough sleep lately?",
-                    "excited": "Your excitement is contagious! What are you looking forward to?",
-                    "grateful": "Gratitude is such a positive mindset. It's great that you're recognizing the good things in your life."
-                }
-                
-                return responses.get(emotion, f"Thank you for sharing that you're feeling {emotion}. Your emotional well-being is important.")
+                return EMOTION_RESPONSES.get(emotion, f"Thank you for sharing that you're feeling {emotion}. Your emotional well-being is important.")
             
             return "Thank you for sharing your thoughts. Self-reflection helps me understand you better and track your emotional journey."
         
@@ -470,7 +697,6 @@ class EnhancedNLPService:
             # Handle future planning with encouragement
             activities = [e["value"] for e in entities if e["type"] == "activity"]
             time_mentions = time_info.get("raw_expression", "") if time_info else ""
-            message_lower = message.lower() if message else ""
             
             if "work" in message_lower or "working" in message_lower:
                 # Check if they're up late and have work tomorrow
@@ -485,76 +711,29 @@ class EnhancedNLPService:
             return "I'll remember that for you. Would you like me to help you prepare or remind you about anything specific?"
         
         else:
-            # Context-aware conversational responses
-            message_lower = message.lower() if message else ""
-            
-            # Check if we're in an active conversation
+            # Context-aware conversational responses; an active conversation
+            # takes precedence over the time-based openers
             if in_conversation or (previous_message and "?" in previous_message):
-                # Continue the conversation naturally
-                if "sleeping late" in message_lower:
-                    return "Ah, planning to sleep in tomorrow? That's good since you're up so late now. Will you be able to with work at 9am though?"
-                elif any(word in message_lower for word in ["tired", "exhausted", "sleepy"]):
-                    return "I can imagine you're tired! Being up this late when you have work tomorrow is rough. What's keeping you from heading to bed?"
-                else:
-                    # Generic conversational continuation
-                    responses = [
-                        "I hear you. What else is on your mind?",
-                        "That makes sense. Tell me more.",
-                        "Interesting. How are you feeling about that?",
-                        "Got it. Anything else you want to talk about?"
-                    ]
-                    return random.choice(responses)
-            
-            # Time-based responses only for new conversations
+                rules = self._conversational_rules["in_conversation"]
             elif current_hour >= 23 or current_hour <= 4:
-                if "still up" in message_lower or "can't sleep" in message_lower:
-                    return "I notice you're up pretty late! What's on your mind? Sometimes talking about it helps. Are you having trouble sleeping, or just enjoying the quiet hours?"
-                elif "work" in message_lower and "tomorrow" in message_lower:
-                    return "Working tomorrow and still awake at this hour? That's going to be a tough morning. What time do you need to be up? Maybe we should think about winding down soon."
-                elif any(greeting in message_lower for greeting in ["hey", "hi", "hello"]):
-                    return "Hey there! You're up late tonight. How's your evening going? Anything interesting keeping you awake?"
-                else:
-                    return "It's pretty late - or early, depending on how you look at it! What brings you here at this hour? Feel like sharing what's on your mind?"
-            
-            # Morning responses (5 AM - 11 AM)
+                rules = self._conversational_rules["late_night"]
             elif 5 <= current_hour < 12:
-                if any(greeting in message_lower for greeting in ["hey", "hi", "hello", "good morning"]):
-                    morning_greetings = [
-                        "Good morning! How did you sleep? Ready to take on the day, or still warming up to it?",
-                        "Hey there! Morning person or still need that coffee? What's the plan for today?",
-                        "Morning! Hope you got some good rest. What's on your mind this morning?",
-                        "Hi! Starting the day early I see. Feeling energized or taking it slow?"
-                    ]
-                    return random.choice(morning_greetings)
-                else:
-                    morning_responses = [
-                        "Morning! What's on your agenda today? I'm here if you want to talk through your plans or just chat.",
-                        "Good morning! Anything exciting happening today, or is it more of a routine kind of day?",
-                        "Rise and shine! What are you looking forward to today? Or maybe dreading?",
-                        "Morning vibes! How are you feeling about the day ahead?"
-                    ]
-                    return random.choice(morning_responses)
-            
-            # Afternoon responses (12 PM - 5 PM)
+                rules = self._conversational_rules["morning"]
             elif 12 <= current_hour < 17:
-                if any(greeting in message_lower for greeting in ["hey", "hi", "hello"]):
-                    return "Hey! How's your day going so far? Productive afternoon or taking it easy?"
-                else:
-                    return "Afternoon! What's happening in your world right now? Feel free to share - whether it's work stuff, personal thoughts, or just random musings."
-            
-            # Evening responses (5 PM - 11 PM)
+                rules = self._conversational_rules["afternoon"]
             elif 17 <= current_hour < 23:
-                if any(greeting in message_lower for greeting in ["hey", "hi", "hello"]):
-                    return "Hey there! How was your day? Winding down or still have things on your plate?"
-                else:
-                    return "Evening! Perfect time to reflect on the day. What's been the highlight so far? Or maybe there's something you need to get off your chest?"
+                rules = self._conversational_rules["evening"]
+            else:
+                rules = ()
+            
+            for pattern, reply in rules:
+                if pattern.search(message_lower):
+                    return reply if isinstance(reply, str) else random.choice(reply)
             
             # Default conversational response with variety
-            default_responses = [
-                "I'm here and listening. What's going on with you right now? Whether it's something specific or you just want to chat, I'm all ears.",
-                "Hey! I'm here for whatever you need - venting, planning, remembering, or just chatting. What's up?",
-                "Thanks for checking in! What's on your mind? I'm here to listen, help you remember things, or just have a conversation.",
-                "Hi there! Feel free to share whatever's on your mind - could be about your day, your thoughts, or anything really. I'm here to listen and help.",
-                "Hey! Whether you want to talk about something specific or just see what's in your memory bank, I'm here. What would you like to do?"
-            ]
-            return random.choice(default_responses)
\ No newline at end of file
+            return random.choice(DEFAULT_RESPONSES)
+
+@lru_cache(maxsize=None)
+def get_enhanced_nlp_service() -> EnhancedNLPService:
+    """Shared EnhancedNLPService so patterns are compiled and analyses cached once per process"""
+    return EnhancedNLPService()
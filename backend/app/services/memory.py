@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, String, cast
+from sqlalchemy import and_, or_, desc, String, cast, insert, func
 from typing import List, Optional, Dict, Any
+from functools import lru_cache
 from datetime import datetime, timedelta
 import json
 import uuid
@@ -8,6 +9,16 @@ import uuid
 from core.models.memory import Memory, MemoryType, MemoryRelation
 from core.models.user import User
 
+# Words too common to count as a shared topic between two memories
+STOP_WORDS = frozenset({"the", "a", "an", "is", "are", "was", "were", "i", "you", "we", "they"})
+
+
+@lru_cache(maxsize=4096)
+def _content_words(content: str) -> frozenset:
+    """Distinct lowercased words of a memory's content, minus stop words"""
+    return frozenset(content.lower().split()) - STOP_WORDS
+
+
 class MemoryService:
     """Service for managing user memories"""
     
@@ -152,51 +163,50 @@ class MemoryService:
             )
         ).limit(20).all()
         
+        new_relations = []
         for other_memory in recent_memories:
             # Check for common entities or topics
             if self._memories_are_related(memory, other_memory):
-                relation = MemoryRelation(
-                    source_memory_id=memory.id,
-                    target_memory_id=other_memory.id,
-                    relation_type="related_to",
-                    strength=0.5
-                )
-                self.db.add(relation)
+                new_relations.append({
+                    "source_memory_id": memory.id,
+                    "target_memory_id": other_memory.id,
+                    "relation_type": "related_to",
+                    "strength": 0.5
+                })
+        
+        # One batched INSERT instead of a flush per relation
+        if new_relations:
+            self.db.execute(insert(MemoryRelation), new_relations)
         
         self.db.commit()
     
     def _memories_are_related(self, memory1: Memory, memory2: Memory) -> bool:
         """Check if two memories are related (simple implementation)"""
-        # Check for common words (excluding common words)
-        common_words = {"the", "a", "an", "is", "are", "was", "were", "i", "you", "we", "they"}
-        
-        words1 = set(memory1.content.lower().split()) - common_words
-        words2 = set(memory2.content.lower().split()) - common_words
-        
-        common = words1.intersection(words2)
+        # Check for common words (excluding stop words); a new memory is compared
+        # with up to 20 recent ones, so each content is tokenized once and cached
+        common = _content_words(memory1.content) & _content_words(memory2.content)
         
         # If they share significant words, they might be related
         return len(common) >= 2
     
     def get_memory_stats(self, user_id: uuid.UUID) -> Dict[str, Any]:
         """Get statistics about user's memories"""
-        total_memories = self.db.query(Memory).filter(Memory.user_id == user_id).count()
-        
-        # Count by type
-        type_counts = {}
-        for memory_type in MemoryType:
-            count = self.db.query(Memory).filter(
-                and_(Memory.user_id == user_id, Memory.memory_type == memory_type)
-            ).count()
-            type_counts[memory_type.value] = count
-        
-        # Recent activity
-        recent_count = self.db.query(Memory).filter(
-            and_(
-                Memory.user_id == user_id,
-                Memory.created_at >= datetime.utcnow() - timedelta(days=7)
-            )
-        ).count()
+        # Per-type totals and last-week counts in one grouped scan
+        week_ago = datetime.utcnow() - timedelta(days=7)
+        rows = self.db.query(
+            Memory.memory_type,
+            func.count(),
+            func.count().filter(Memory.created_at >= week_ago)
+        ).filter(Memory.user_id == user_id).group_by(Memory.memory_type).all()
+        
+        type_counts = {memory_type.value: 0 for memory_type in MemoryType}
+        total_memories = 0
+        recent_count = 0
+        for memory_type, count, recent in rows:
+            if memory_type is not None:
+                type_counts[memory_type.value] = count
+            total_memories += count
+            recent_count += recent
         
         return {
             "total_memories": total_memories,
@@ -1,17 +1,26 @@
 from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
 from datetime import datetime, timedelta
 import uuid
 import json
+import asyncio
+import heapq
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, text
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, and_, or_, func, text, null, case
+from sqlalchemy.orm import selectinload, raiseload
 
 from core.models.memory import Memory, MemoryType, MemoryRelation
-from app.services.embedding_service import EmbeddingService
+from app.services.embedding_service import EmbeddingService, EmbeddingIndex, RELATIONSHIP_TOP_K
 
 logger = logging.getLogger(__name__)
 
+# HNSW candidate list size for pgvector k-NN scans (recall vs. latency)
+HNSW_EF_SEARCH = 100
+
+# Rows per chunk when streaming embeddings without pgvector
+EMBEDDING_STREAM_BATCH = 1000
+
 class MemoryService:
     """Enhanced memory service with vector embeddings and semantic search"""
     
@@ -43,7 +52,9 @@ class MemoryService:
         """
         # Create embedding for the memory
         metadata = metadata or {}
-        embedding = self.embedding_service.create_memory_embedding(content, metadata)
+        embedding = self.embedding_service.serialize_for_db(
+            await self.embedding_service.create_memory_embedding(content, metadata)
+        )
         
         # Create memory object
         memory = Memory(
@@ -64,6 +75,58 @@ class MemoryService:
         
         return memory
     
+    async def store_memories_bulk(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        memories: List[Dict[str, Any]]
+    ) -> List[Memory]:
+        """
+        Store several memories with a single multi-row INSERT.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            memories: Dicts with content, memory_type and optional
+                metadata / confidence_score keys (as in store_memory)
+            
+        Returns:
+            Created memory objects
+        """
+        if not memories:
+            return []
+        
+        # Embed all memories concurrently so they share batched model calls
+        metadatas = [memory.get("metadata") or {} for memory in memories]
+        embeddings = await asyncio.gather(*(
+            self.embedding_service.create_memory_embedding(memory["content"], metadata)
+            for memory, metadata in zip(memories, metadatas)
+        ))
+        
+        rows = []
+        for memory, metadata, embedding in zip(memories, metadatas, embeddings):
+            rows.append({
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "content": memory["content"],
+                "memory_type": MemoryType(memory["memory_type"]),
+                "meta_data": metadata,
+                "embedding": self.embedding_service.serialize_for_db(embedding),
+                "confidence_score": memory.get("confidence_score", 1.0)
+            })
+        
+        result = await db.scalars(insert(Memory).returning(Memory), rows)
+        created = list(result)
+        await db.commit()
+        
+        # Find and create relationships with existing memories, sharing one index
+        # unless Postgres can answer each lookup from its vector index
+        index = None if self._uses_pgvector(db) else await self._embedding_index(db, user_id)
+        for memory in created:
+            await self._update_memory_relationships(db, memory, index=index)
+        
+        return created
+    
     async def semantic_search(
         self,
         db: AsyncSession,
@@ -94,7 +157,7 @@ class MemoryService:
             "memory_type": [mt.value for mt in memory_types] if memory_types else None,
             "time_range": f"{time_range[0]} to {time_range[1]}" if time_range else None
         }
-        query_embedding = self.embedding_service.create_query_embedding(query, context)
+        query_embedding = await self.embedding_service.create_query_embedding(query, context)
         
         # Build base query
         base_query = select(Memory).where(Memory.user_id == user_id)
@@ -111,33 +174,128 @@ class MemoryService:
                 )
             )
         
-        # Get all matching memories
-        result = await db.execute(base_query)
-        memories = result.scalars().all()
+        # Let Postgres walk the HNSW index instead of scoring every memory here
+        if self._uses_pgvector(db):
+            return await self._semantic_search_pgvector(
+                db, base_query, query_embedding, limit, similarity_threshold
+            )
+        
+        # Get the embeddings of all matching memories, without the other columns
+        result = await db.execute(base_query.with_only_columns(Memory.id, Memory.embedding))
+        
+        # Score them all with one matrix-vector product and keep the top hits
+        matches = self.embedding_service.find_similar_embeddings(
+            query_embedding,
+            [(str(memory_id), embedding) for memory_id, embedding in result.all()],
+            similarity_threshold,
+            limit
+        )
+        if not matches:
+            return []
+        
+        # Load full rows for the hits only
+        hits_result = await db.execute(
+            select(Memory)
+            .where(Memory.id.in_([uuid.UUID(memory_id) for memory_id, _ in matches]))
+            .options(raiseload("*"))
+        )
+        memories = {str(memory.id): memory for memory in hits_result.scalars().all()}
         
-        # Calculate similarities
         memory_scores = []
-        for memory in memories:
-            if memory.embedding:
-                similarity = self.embedding_service.calculate_similarity(
-                    query_embedding,
-                    memory.embedding
-                )
-                
-                if similarity >= similarity_threshold:
-                    memory_scores.append({
-                        "memory": memory,
-                        "similarity": similarity,
-                        "id": str(memory.id),
-                        "content": memory.content,
-                        "type": memory.memory_type.value,
-                        "metadata": memory.meta_data,
-                        "created_at": memory.created_at.isoformat()
-                    })
+        for memory_id, similarity in matches:
+            memory = memories[memory_id]
+            memory_scores.append({
+                "memory": memory,
+                "similarity": similarity,
+                "id": memory_id,
+                "content": memory.content,
+                "type": memory.memory_type.value,
+                "metadata": memory.meta_data,
+                "created_at": memory.created_at.isoformat()
+            })
+        
+        return memory_scores
+    
+    async def _execute_knn(self, db: AsyncSession, statement, k: int) -> List[Any]:
+        """
+        Run a filtered ORDER BY distance LIMIT k query, exactly when it matters.
         
-        # Sort by similarity and limit
-        memory_scores.sort(key=lambda x: x["similarity"], reverse=True)
-        return memory_scores[:limit]
+        The HNSW scan returns its ef_search nearest rows across all users and
+        the WHERE clause is applied afterwards, so a user's rows can be cut
+        short. When fewer than k rows come back, the query is rerun with index
+        scans disabled, which gives an exact scan of the filtered rows.
+        
+        Args:
+            db: Database session
+            statement: Nearest-neighbour select ordered by distance
+            k: Rows the statement asks for
+            
+        Returns:
+            Result rows, nearest first
+        """
+        # Applies to this transaction only; never fewer candidates than rows wanted
+        await db.execute(text(f"SET LOCAL hnsw.ef_search = {max(HNSW_EF_SEARCH, k)}"))
+        rows = (await db.execute(statement)).all()
+        if len(rows) >= k:
+            return rows
+        
+        await db.execute(text("SET LOCAL enable_indexscan = off"))
+        try:
+            return (await db.execute(statement)).all()
+        finally:
+            await db.execute(text("SET LOCAL enable_indexscan TO DEFAULT"))
+    
+    async def _semantic_search_pgvector(
+        self,
+        db: AsyncSession,
+        base_query,
+        query_embedding,
+        limit: int,
+        similarity_threshold: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Run semantic_search as a pgvector nearest-neighbour query.
+        
+        Args:
+            db: Database session
+            base_query: select(Memory) with the user / type / time filters applied
+            query_embedding: Unit-norm query vector
+            limit: Maximum number of results
+            similarity_threshold: Minimum similarity score
+            
+        Returns:
+            List of memories with similarity scores, most similar first
+        """
+        distance = Memory.embedding.cosine_distance(query_embedding)
+        rows = await self._execute_knn(
+            db,
+            base_query
+            .add_columns(distance.label("distance"))
+            .where(Memory.embedding != None)
+            .order_by(distance)
+            .limit(limit)
+            .options(raiseload("*")),
+            limit
+        )
+        
+        memory_scores = []
+        for memory, memory_distance in rows:
+            similarity = 1.0 - memory_distance
+            # Rows come nearest first, so the rest are below the threshold too
+            if similarity < similarity_threshold:
+                break
+            
+            memory_scores.append({
+                "memory": memory,
+                "similarity": similarity,
+                "id": str(memory.id),
+                "content": memory.content,
+                "type": memory.memory_type.value,
+                "metadata": memory.meta_data,
+                "created_at": memory.created_at.isoformat()
+            })
+        
+        return memory_scores
     
     async def hybrid_search(
         self,
@@ -167,12 +325,24 @@ class MemoryService:
         semantic_scores = {r["id"]: r["similarity"] * semantic_weight for r in semantic_results}
         
         # Perform keyword search
-        keyword_query = select(Memory).where(
-            and_(
-                Memory.user_id == user_id,
-                func.lower(Memory.content).contains(query.lower())
+        if self._uses_pgvector(db):
+            # Token match against the GIN-indexed tsvector, ranked in the database
+            tsquery = func.plainto_tsquery("simple", query)
+            document = func.to_tsvector("simple", Memory.content)
+            rank = func.ts_rank(document, tsquery)
+            keyword_query = (
+                select(Memory, rank.label("rank"))
+                .where(and_(Memory.user_id == user_id, document.op("@@")(tsquery)))
+                .order_by(rank.desc())
+                .options(raiseload("*"))
             )
-        )
+        else:
+            keyword_query = select(Memory, null().label("rank")).where(
+                and_(
+                    Memory.user_id == user_id,
+                    Memory.content.ilike(f"%{query}%")
+                )
+            ).options(raiseload("*"))
         
         if kwargs.get("memory_types"):
             keyword_query = keyword_query.where(Memory.memory_type.in_(kwargs["memory_types"]))
@@ -186,13 +356,15 @@ class MemoryService:
             )
         
         result = await db.execute(keyword_query.limit(kwargs.get("limit", 20)))
-        keyword_memories = result.scalars().all()
+        keyword_rows = result.all()
+        keyword_memories = [memory for memory, _ in keyword_rows]
         
-        # Calculate keyword scores based on match frequency
+        # Keyword scores: ts_rank where available, else match frequency
         keyword_scores = {}
-        for memory in keyword_memories:
-            match_count = memory.content.lower().count(query.lower())
-            normalized_score = min(1.0, match_count / 10.0)  # Normalize to 0-1
+        for memory, rank in keyword_rows:
+            if rank is None:
+                rank = memory.content.lower().count(query.lower()) / 10.0
+            normalized_score = min(1.0, rank)  # Normalize to 0-1
             keyword_scores[str(memory.id)] = normalized_score * keyword_weight
         
         # Combine scores
@@ -247,16 +419,21 @@ class MemoryService:
         """
         # Get the memory and its relationships
         memory_result = await db.execute(
-            select(Memory).where(Memory.id == memory_id)
+            select(Memory).where(Memory.id == memory_id).options(raiseload("*"))
         )
         memory = memory_result.scalar_one_or_none()
         
         if not memory:
             return []
         
-        # Get relationships
+        # Get relationships together with the memory on their other end
+        related_id = case(
+            (MemoryRelation.source_memory_id == memory_id, MemoryRelation.target_memory_id),
+            else_=MemoryRelation.source_memory_id
+        )
         relations_result = await db.execute(
-            select(MemoryRelation)
+            select(MemoryRelation, Memory)
+            .join(Memory, Memory.id == related_id)
             .where(
                 or_(
                     MemoryRelation.source_memory_id == memory_id,
@@ -265,36 +442,23 @@ class MemoryService:
             )
             .order_by(MemoryRelation.strength.desc())
             .limit(limit)
+            .options(raiseload("*"))
         )
-        relations = relations_result.scalars().all()
         
-        # Get related memories
         related_memories = []
-        for relation in relations:
-            related_id = (
-                relation.target_memory_id 
-                if relation.source_memory_id == memory_id 
-                else relation.source_memory_id
-            )
-            
-            related_result = await db.execute(
-                select(Memory).where(Memory.id == related_id)
-            )
-            related_memory = related_result.scalar_one_or_none()
-            
-            if related_memory:
-                related_memories.append({
-                    "memory": related_memory,
-                    "relationship": {
-                        "type": relation.relation_type,
-                        "strength": relation.strength
-                    },
-                    "id": str(related_memory.id),
-                    "content": related_memory.content,
-                    "type": related_memory.memory_type.value,
-                    "metadata": related_memory.meta_data,
-                    "created_at": related_memory.created_at.isoformat()
-                })
+        for relation, related_memory in relations_result.all():
+            related_memories.append({
+                "memory": related_memory,
+                "relationship": {
+                    "type": relation.relation_type,
+                    "strength": relation.strength
+                },
+                "id": str(related_memory.id),
+                "content": related_memory.content,
+                "type": related_memory.memory_type.value,
+                "metadata": related_memory.meta_data,
+                "created_at": related_memory.created_at.isoformat()
+            })
         
         return related_memories
     
@@ -325,6 +489,7 @@ class MemoryService:
                 )
             )
             .limit(batch_size)
+            .options(raiseload("*"))
         )
         memories = result.scalars().all()
         
@@ -337,36 +502,68 @@ class MemoryService:
         
         # Update memories
         for memory, embedding in zip(memories, embeddings):
-            memory.embedding = embedding
+            memory.embedding = self.embedding_service.serialize_for_db(embedding)
         
         await db.commit()
         
-        # Update relationships for new embeddings
+        # Update relationships for new embeddings, sharing one index
+        # unless Postgres can answer each lookup from its vector index
+        index = None if self._uses_pgvector(db) else await self._embedding_index(db, user_id)
         for memory in memories:
-            await self._update_memory_relationships(db, memory)
+            await self._update_memory_relationships(db, memory, index=index)
         
         return len(memories)
     
-    async def _update_memory_relationships(
+    async def _embedding_index(self, db: AsyncSession, user_id: uuid.UUID) -> EmbeddingIndex:
+        """
+        Load a user's memory embeddings into a search index.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            
+        Returns:
+            Index of every embedded memory of the user, keyed by memory id
+        """
+        result = await db.execute(
+            select(Memory.id, Memory.embedding)
+            .where(
+                and_(
+                    Memory.user_id == user_id,
+                    Memory.embedding != None
+                )
+            )
+        )
+        return EmbeddingIndex.from_pairs(
+            [(str(memory_id), embedding) for memory_id, embedding in result.all()],
+            self.embedding_service.embedding_dimension
+        )
+    
+    def _uses_pgvector(self, db: AsyncSession) -> bool:
+        """Whether the session talks to Postgres, where embeddings are pgvector-indexed"""
+        return db.bind.dialect.name == "postgresql"
+    
+    async def _nearest_memories_pgvector(
         self,
         db: AsyncSession,
         memory: Memory,
-        similarity_threshold: float = 0.7
-    ):
+        similarity_threshold: float
+    ) -> List[Tuple[str, float]]:
         """
-        Update relationships for a memory based on embedding similarity.
+        Find a memory's strongest relationships with an HNSW nearest-neighbour query.
         
         Args:
             db: Database session
-            memory: Memory to update relationships for
-            similarity_threshold: Minimum similarity for creating relationship
+            memory: Memory with an embedding
+            similarity_threshold: Minimum similarity for a relationship
+            
+        Returns:
+            List of (related_memory_id, strength) tuples, strongest first
         """
-        if not memory.embedding:
-            return
-        
-        # Get other memories from the same user
-        result = await db.execute(
-            select(Memory)
+        distance = Memory.embedding.cosine_distance(memory.embedding)
+        rows = await self._execute_knn(
+            db,
+            select(Memory.id, distance.label("distance"))
             .where(
                 and_(
                     Memory.user_id == memory.user_id,
@@ -374,45 +571,132 @@ class MemoryService:
                     Memory.embedding != None
                 )
             )
+            .order_by(distance)
+            .limit(RELATIONSHIP_TOP_K),
+            RELATIONSHIP_TOP_K
         )
-        other_memories = result.scalars().all()
-        
-        # Find similar memories
-        embeddings = [(str(m.id), m.embedding) for m in other_memories]
-        relationships = self.embedding_service.update_memory_relationships(
-            str(memory.id),
-            memory.embedding,
-            embeddings,
-            similarity_threshold
+        
+        return [
+            (str(related_id), 1.0 - related_distance)
+            for related_id, related_distance in rows
+            if 1.0 - related_distance >= similarity_threshold
+        ]
+    
+    async def _nearest_memories_streamed(
+        self,
+        db: AsyncSession,
+        memory: Memory,
+        similarity_threshold: float
+    ) -> List[Tuple[str, float]]:
+        """
+        Find a memory's strongest relationships by streaming the user's embeddings.
+        
+        Only one chunk of embeddings and the running top K are held at a time.
+        
+        Args:
+            db: Database session
+            memory: Memory with an embedding
+            similarity_threshold: Minimum similarity for a relationship
+            
+        Returns:
+            List of (related_memory_id, strength) tuples, strongest first
+        """
+        result = await db.stream(
+            select(Memory.id, Memory.embedding)
+            .where(
+                and_(
+                    Memory.user_id == memory.user_id,
+                    Memory.id != memory.id,
+                    Memory.embedding != None
+                )
+            )
+            .execution_options(yield_per=EMBEDDING_STREAM_BATCH)
         )
         
-        # Create relationship records
-        for related_id, strength in relationships:
-            # Check if relationship already exists
-            existing = await db.execute(
-                select(MemoryRelation)
-                .where(
-                    or_(
-                        and_(
-                            MemoryRelation.source_memory_id == memory.id,
-                            MemoryRelation.target_memory_id == uuid.UUID(related_id)
-                        ),
-                        and_(
-                            MemoryRelation.source_memory_id == uuid.UUID(related_id),
-                            MemoryRelation.target_memory_id == memory.id
-                        )
+        best: List[Tuple[str, float]] = []
+        async for rows in result.partitions():
+            chunk = EmbeddingIndex.from_pairs(
+                [(str(related_id), embedding) for related_id, embedding in rows],
+                self.embedding_service.embedding_dimension
+            )
+            matches = self.embedding_service.find_similar_embeddings(
+                memory.embedding, chunk, similarity_threshold, RELATIONSHIP_TOP_K
+            )
+            best = heapq.nlargest(RELATIONSHIP_TOP_K, best + matches, key=lambda match: match[1])
+        
+        return best
+    
+    async def _update_memory_relationships(
+        self,
+        db: AsyncSession,
+        memory: Memory,
+        similarity_threshold: float = 0.7,
+        index: Optional[EmbeddingIndex] = None
+    ):
+        """
+        Update relationships for a memory based on embedding similarity.
+        
+        Args:
+            db: Database session
+            memory: Memory to update relationships for
+            similarity_threshold: Minimum similarity for creating relationship
+            index: Prebuilt index of the user's embeddings, reused across calls;
+                without one the lookup runs in the database or over a stream
+        """
+        if memory.embedding is None:
+            return
+        
+        # Find similar memories (the memory itself is excluded by id)
+        if index is not None:
+            relationships = self.embedding_service.update_memory_relationships(
+                str(memory.id),
+                memory.embedding,
+                index,
+                similarity_threshold
+            )
+        elif self._uses_pgvector(db):
+            relationships = await self._nearest_memories_pgvector(db, memory, similarity_threshold)
+        else:
+            relationships = await self._nearest_memories_streamed(db, memory, similarity_threshold)
+        
+        if not relationships:
+            return
+        
+        # Find the pairs that are already linked, in either direction, in one query
+        candidate_ids = [uuid.UUID(related_id) for related_id, _ in relationships]
+        existing_result = await db.execute(
+            select(MemoryRelation.source_memory_id, MemoryRelation.target_memory_id)
+            .where(
+                or_(
+                    and_(
+                        MemoryRelation.source_memory_id == memory.id,
+                        MemoryRelation.target_memory_id.in_(candidate_ids)
+                    ),
+                    and_(
+                        MemoryRelation.source_memory_id.in_(candidate_ids),
+                        MemoryRelation.target_memory_id == memory.id
                     )
                 )
             )
-            
-            if not existing.scalar_one_or_none():
-                relation = MemoryRelation(
-                    source_memory_id=memory.id,
-                    target_memory_id=uuid.UUID(related_id),
-                    relation_type="similar_content",
-                    strength=strength
-                )
-                db.add(relation)
+        )
+        linked = {
+            target_id if source_id == memory.id else source_id
+            for source_id, target_id in existing_result.all()
+        }
+        
+        # Create relationship records for the rest with one multi-row INSERT
+        new_relations = [
+            {
+                "source_memory_id": memory.id,
+                "target_memory_id": related_id,
+                "relation_type": "similar_content",
+                "strength": strength
+            }
+            for related_id, (_, strength) in zip(candidate_ids, relationships)
+            if related_id not in linked
+        ]
+        if new_relations:
+            await db.execute(insert(MemoryRelation), new_relations)
         
         await db.commit()
     
@@ -433,9 +717,16 @@ class MemoryService:
         Returns:
             Dictionary of cluster names to memories
         """
-        # Get all memories with embeddings
+        # Get all memories with embeddings, as plain rows of the columns used below
         result = await db.execute(
-            select(Memory)
+            select(
+                Memory.id,
+                Memory.embedding,
+                Memory.content,
+                Memory.memory_type,
+                Memory.meta_data,
+                Memory.created_at
+            )
             .where(
                 and_(
                     Memory.user_id == user_id,
@@ -443,7 +734,7 @@ class MemoryService:
                 )
             )
         )
-        memories = result.scalars().all()
+        memories = result.all()
         
         if not memories:
             return {}
@@ -505,4 +796,10 @@ class MemoryService:
             most_common_type = Counter(types).most_common(1)[0][0]
             return f"{most_common_type.title()} Memories"
         
-        return "Memory Cluster"
\ No newline at end of file
+        return "Memory Cluster"
+
+
+@lru_cache(maxsize=None)
+def get_memory_service() -> MemoryService:
+    """Shared MemoryService so the embedding model is loaded once per process"""
+    return MemoryService()
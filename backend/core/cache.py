@@ -0,0 +1,24 @@
+import redis.asyncio as redis
+from typing import Any, Optional
+import json
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Redis URL
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+# Shared async Redis client (connection pool is created lazily)
+redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+
+
+async def get_cached_json(key: str) -> Optional[Any]:
+    """Return the cached JSON value for key, or None on a miss"""
+    cached = await redis_client.get(key)
+    return json.loads(cached) if cached else None
+
+
+async def set_cached_json(key: str, value: Any, ttl: int):
+    """Cache a JSON-serializable value for ttl seconds"""
+    await redis_client.set(key, json.dumps(value, default=str), ex=ttl)
@@ -0,0 +1,19 @@
+from celery import Celery
+
+from core.cache import REDIS_URL
+
+# Celery application (run with: celery -A core.celery_app worker)
+celery_app = Celery(
+    "digital_twin",
+    broker=REDIS_URL,
+    backend=REDIS_URL,
+    include=["integrations.todoist.tasks"]
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    task_track_started=True,
+    result_expires=3600  # seconds
+)
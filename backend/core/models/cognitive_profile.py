@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, JSON, ForeignKey, DateTime, Text
+from sqlalchemy import Column, String, Float, JSON, ForeignKey, DateTime, Text, Integer, LargeBinary
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -68,6 +68,7 @@ class CognitiveProfile(Base):
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     analysis_count = Column(Float, default=0)  # Number of analyses performed
     data_points = Column(Float, default=0)  # Number of data points used
+    last_analysis_fingerprint = Column(LargeBinary, nullable=True)  # Digest of the memory set last analyzed
     
     # Relationships
     user = relationship("User", backref="cognitive_profile")
@@ -85,4 +86,20 @@ class ProfileAnalysisLog(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    profile = relationship("CognitiveProfile", backref="analysis_logs")
\ No newline at end of file
+    profile = relationship("CognitiveProfile", backref="analysis_logs")
+
+
+class ProfileKeyword(Base):
+    __tablename__ = "profile_keywords"
+    
+    # Keywords the memories trigger counts into user_keyword_hits
+    keyword = Column(String, primary_key=True)
+
+
+class UserKeywordHit(Base):
+    __tablename__ = "user_keyword_hits"
+    
+    # Maintained by the memories_keyword_hits trigger (whole-word occurrences per user)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    keyword = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,12 +1,16 @@
 from sqlalchemy import Column, String, Integer, JSON, ForeignKey, DateTime, Enum as SQLEnum, Text, Float
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
+from pgvector.sqlalchemy import Vector
 from datetime import datetime
 import uuid
 import enum
 
 from core.database import Base
 
+# Output size of the all-MiniLM-L6-v2 sentence embeddings stored on memories
+EMBEDDING_DIMENSION = 384
+
 class MemoryType(str, enum.Enum):
     EPISODIC = "episodic"  # Specific events and experiences
     SEMANTIC = "semantic"  # General knowledge and facts
@@ -22,7 +26,7 @@ class Memory(Base):
     content = Column(Text, nullable=False)
     memory_type = Column(SQLEnum(MemoryType), default=MemoryType.EPISODIC)
     meta_data = Column(JSON, default={})
-    embedding = Column(JSON, nullable=True)  # Store vector embeddings
+    embedding = Column(Vector(EMBEDDING_DIMENSION), nullable=True)  # pgvector, HNSW-indexed for k-NN search
     confidence_score = Column(Float, default=1.0)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
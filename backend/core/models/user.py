@@ -1,21 +1,53 @@
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSON
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 import uuid
 
 from core.database import Base
 
 
+class utcnow(FunctionElement):
+    """Current time as a naive UTC timestamp, rendered for each database"""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    # SQLite (the dev database) keeps CURRENT_TIMESTAMP in UTC
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _compile_utcnow_postgresql(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Partial expression index for "which users have Todoist connected" lookups
+        Index(
+            "ix_users_todoist_connected",
+            text("(integrations_data -> 'todoist' ->> 'connected')"),
+            postgresql_where=text("integrations_data -> 'todoist' IS NOT NULL")
+        ),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, nullable=False, index=True)
     username = Column(String, unique=True, nullable=False, index=True)
     password_hash = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Timestamps are set by the database (naive UTC, as before)
+    created_at = Column(DateTime, server_default=utcnow(), nullable=False)
+    updated_at = Column(
+        DateTime,
+        server_default=utcnow(),
+        onupdate=utcnow(),
+        nullable=False
+    )
     integrations_data = Column(JSON, nullable=True, default={})
     
     # Relationships
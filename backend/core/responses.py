@@ -0,0 +1,14 @@
+from typing import Any
+from fastapi.responses import JSONResponse
+import orjson
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson
+    
+    Unlike fastapi.responses.ORJSONResponse this also accepts non-string dict
+    keys, which the analysis endpoints return.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
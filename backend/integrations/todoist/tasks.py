@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import uuid
+from typing import Dict, Any
+
+import httpx
+from sqlalchemy import select
+
+from core.celery_app import celery_app
+from core.database import AsyncSessionLocal, engine
+from core.models.user import User
+from integrations.todoist.todoist_service import TodoistService
+from app.services.memory_service import get_memory_service
+from app.services.cognitive_profile_service import get_cognitive_profile_service
+
+logger = logging.getLogger(__name__)
+
+
+async def _analyze_tasks(user_id: uuid.UUID) -> Dict[str, Any]:
+    """Analyze task patterns, store insights as memories and update the cognitive profile"""
+    async with AsyncSessionLocal() as db:
+        # Get user's Todoist credentials
+        result = await db.execute(
+            select(User.id, User.integrations_data).where(User.id == user_id)
+        )
+        user = result.first()
+        
+        if not user or not user.integrations_data or not user.integrations_data.get('todoist', {}).get('connected'):
+            raise ValueError("Todoist not connected")
+        
+        # Analyze tasks; the shared client is bound to the API process's loop,
+        # so each job uses its own client
+        async with httpx.AsyncClient(timeout=10) as client:
+            service = TodoistService(client)
+            service.set_access_token(user.integrations_data['todoist']['access_token'])
+            analysis = await service.analyze_task_patterns()
+        
+        # Store insights as memories
+        memory_service = get_memory_service()
+        cognitive_service = get_cognitive_profile_service()
+        
+        # Store all task insights as memories in one batch
+        memories = [
+            {
+                "memory_type": "semantic",
+                "content": f"Task management: {analysis['active_tasks_count']} active tasks across {analysis['projects_count']} projects",
+                "metadata": {
+                    "source": "todoist_analysis",
+                    "analysis_type": "task_overview",
+                    "stats": {
+                        "active_tasks": analysis['active_tasks_count'],
+                        "projects": analysis['projects_count'],
+                        "completed_30d": analysis['completed_tasks_30d']
+                    }
+                }
+            }
+        ]
+        
+        # Productivity insights
+        productivity = analysis['productivity_insights']
+        if productivity['daily_average'] > 0:
+            memories.append({
+                "memory_type": "semantic",
+                "content": f"Completes average of {productivity['daily_average']:.1f} tasks per day, most productive on {productivity.get('most_productive_day', 'weekdays')}",
+                "metadata": {
+                    "source": "todoist_analysis",
+                    "productivity_metrics": productivity
+                }
+            })
+        
+        # Priority usage patterns
+        priority_data = analysis['priority_usage']
+        memories.append({
+            "memory_type": "procedural",
+            "content": f"Task prioritization: {priority_data['high_priority']} high priority, {priority_data['medium_priority']} medium priority tasks",
+            "metadata": {
+                "source": "todoist_analysis",
+                "priority_patterns": priority_data
+            }
+        })
+        
+        await memory_service.store_memories_bulk(db, user_id, memories)
+        
+        # Update cognitive profile based on task patterns
+        profile_updates = {}
+        
+        # High conscientiousness if many tasks with due dates and using priorities
+        task_patterns = analysis['task_patterns']
+        if task_patterns['tasks_with_due_dates_percentage'] > 70:
+            profile_updates['conscientiousness'] = 0.8
+        elif task_patterns['tasks_with_due_dates_percentage'] > 40:
+            profile_updates['conscientiousness'] = 0.6
+        
+        # Openness based on project diversity
+        project_dist = analysis['project_distribution']
+        if project_dist['project_count'] > 5:
+            profile_updates['openness'] = 0.7
+        
+        # Update profile if we have insights
+        if profile_updates:
+            await cognitive_service.update_profile_from_behaviors(
+                db, user_id, profile_updates
+            )
+        
+        return {
+            "user_id": str(user_id),
+            "tasks_analyzed": analysis['active_tasks_count'],
+            "insights": analysis
+        }
+
+
+async def _run_analysis(user_id: str) -> Dict[str, Any]:
+    try:
+        return await _analyze_tasks(uuid.UUID(user_id))
+    finally:
+        # Pooled connections are bound to this task's event loop
+        await engine.dispose()
+
+
+@celery_app.task(name="todoist.analyze_tasks")
+def analyze_todoist_tasks(user_id: str) -> Dict[str, Any]:
+    """Background job behind POST /api/todoist/analyze"""
+    try:
+        return asyncio.run(_run_analysis(user_id))
+    except Exception as e:
+        logger.error(f"Error analyzing tasks: {str(e)}")
+        raise
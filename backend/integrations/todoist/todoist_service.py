@@ -1,22 +1,36 @@
 import os
 import json
-import requests
+import asyncio
+import httpx
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from urllib.parse import urlencode
 import hashlib
 import secrets
 
+# Shared keep-alive client so requests reuse TCP/TLS connections to Todoist
+_http_client = httpx.AsyncClient(
+    timeout=10,
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+)
+
+
+async def close_http_client() -> None:
+    """Release the shared client's keep-alive connections (call on app shutdown)"""
+    await _http_client.aclose()
+
+
 class TodoistService:
     """Service for interacting with Todoist API"""
     
     API_BASE_URL = "https://api.todoist.com/rest/v2"
     OAUTH_BASE_URL = "https://todoist.com/oauth"
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.client_id = os.getenv('TODOIST_CLIENT_ID')
         self.client_secret = os.getenv('TODOIST_CLIENT_SECRET')
         self.access_token = None
+        self.client = client or _http_client
     
     def get_authorization_url(self, state: str) -> str:
         """Get OAuth2 authorization URL for Todoist"""
@@ -29,7 +43,7 @@ class TodoistService:
         
         return f"{self.OAUTH_BASE_URL}/authorize?{urlencode(params)}"
     
-    def handle_oauth_callback(self, code: str) -> Dict[str, Any]:
+    async def handle_oauth_callback(self, code: str) -> Dict[str, Any]:
         """Exchange authorization code for access token"""
         data = {
             'client_id': self.client_id,
@@ -38,14 +52,14 @@ class TodoistService:
             'redirect_uri': 'http://localhost:8000/api/todoist/oauth-callback'
         }
         
-        response = requests.post(f"{self.OAUTH_BASE_URL}/access_token", data=data)
+        response = await self.client.post(f"{self.OAUTH_BASE_URL}/access_token", data=data)
         response.raise_for_status()
         
         token_data = response.json()
         self.access_token = token_data['access_token']
         
         # Get user info
-        user_info = self._make_request('GET', '/sync/v9/user')
+        user_info = await self._make_request('GET', '/sync/v9/user')
         
         return {
             'access_token': token_data['access_token'],
@@ -56,7 +70,7 @@ class TodoistService:
         """Set access token for API requests"""
         self.access_token = token
     
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
         """Make authenticated request to Todoist API"""
         if not self.access_token:
             raise ValueError("No access token available")
@@ -69,26 +83,26 @@ class TodoistService:
         url = f"{self.API_BASE_URL}{endpoint}"
         
         if method == 'GET':
-            response = requests.get(url, headers=headers, params=data)
+            response = await self.client.get(url, headers=headers, params=data)
         else:
-            response = requests.request(method, url, headers=headers, json=data)
+            response = await self.client.request(method, url, headers=headers, json=data)
         
         response.raise_for_status()
         return response.json()
     
-    def get_projects(self) -> List[Dict[str, Any]]:
+    async def get_projects(self) -> List[Dict[str, Any]]:
         """Get all projects"""
-        return self._make_request('GET', '/projects')
+        return await self._make_request('GET', '/projects')
     
-    def get_tasks(self, filter: Optional[str] = None) -> List[Dict[str, Any]]:
+    async def get_tasks(self, filter: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get tasks with optional filter"""
         params = {}
         if filter:
             params['filter'] = filter
         
-        return self._make_request('GET', '/tasks', params)
+        return await self._make_request('GET', '/tasks', params)
     
-    def get_completed_tasks(self, since: Optional[datetime] = None, limit: int = 200) -> List[Dict[str, Any]]:
+    async def get_completed_tasks(self, since: Optional[datetime] = None, limit: int = 200) -> List[Dict[str, Any]]:
         """Get completed tasks"""
         params = {
             'limit': limit
@@ -99,7 +113,7 @@ class TodoistService:
         
         # Todoist API v2 doesn't have direct completed tasks endpoint
         # We'll use the activity/events endpoint instead
-        events = self._make_request('GET', '/activity/events', params)
+        events = await self._make_request('GET', '/activity/events', params)
         
         completed_tasks = []
         for event in events:
@@ -108,18 +122,18 @@ class TodoistService:
         
         return completed_tasks
     
-    def analyze_task_patterns(self) -> Dict[str, Any]:
+    async def analyze_task_patterns(self) -> Dict[str, Any]:
         """Analyze user's task management patterns"""
         try:
             # Get all projects
-            projects = self.get_projects()
+            projects = await self.get_projects()
             
             # Get active tasks
-            active_tasks = self.get_tasks()
+            active_tasks = await self.get_tasks()
             
             # Get completed tasks from last 30 days
             since = datetime.now() - timedelta(days=30)
-            completed_events = self.get_completed_tasks(since=since)
+            completed_events = await self.get_completed_tasks(since=since)
             
             analysis = {
                 "projects_count": len(projects),
@@ -260,20 +274,21 @@ class TodoistService:
             }
         }
     
-    def get_task_stats(self) -> Dict[str, Any]:
+    async def get_task_stats(self) -> Dict[str, Any]:
         """Get basic task statistics"""
         try:
-            active_tasks = self.get_tasks()
-            projects = self.get_projects()
-            
-            # Count tasks by status
-            today_count = len(self.get_tasks(filter='today'))
-            overdue_count = len(self.get_tasks(filter='overdue'))
+            # Fetch everything concurrently over the shared client
+            active_tasks, projects, today_tasks, overdue_tasks = await asyncio.gather(
+                self.get_tasks(),
+                self.get_projects(),
+                self.get_tasks(filter='today'),
+                self.get_tasks(filter='overdue')
+            )
             
             return {
                 "total_active_tasks": len(active_tasks),
-                "today_tasks": today_count,
-                "overdue_tasks": overdue_count,
+                "today_tasks": len(today_tasks),
+                "overdue_tasks": len(overdue_tasks),
                 "total_projects": len(projects)
             }
         except Exception as e:
@@ -1,12 +1,16 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
 import logging
+import os
 from typing import Dict
 
 from api import auth, health, behavioral, memory, integrations, chat, cognitive_profile, gmail, calendar, todoist, screen_observer, ml_models, recommendations
-from core.database import init_db
+from core.database import init_db, warm_pool
 from core.websocket_manager import WebSocketManager
+from core.responses import ORJSONResponse
+from integrations.todoist.todoist_service import close_http_client as close_todoist_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,10 +25,18 @@ async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     # Startup
     logger.info("Starting Digital Twin Platform...")
+    # Process pool for CPU-bound work such as password hashing
+    app.state.cpu_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
     # await init_db()  # Commented out for now to allow startup without database
+    try:
+        await warm_pool()
+    except Exception as e:
+        logger.warning(f"Could not warm database pool: {e}")
     yield
     # Shutdown
     logger.info("Shutting down Digital Twin Platform...")
+    app.state.cpu_pool.shutdown(wait=False)
+    await close_todoist_client()
 
 
 # Create FastAPI app
@@ -32,7 +44,8 @@ app = FastAPI(
     title="Digital Twin Platform",
     description="A platform that creates a true digital twin of you",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -4,6 +4,8 @@ from contextlib import asynccontextmanager
 import logging
 from dotenv import load_dotenv
 
+from core.responses import ORJSONResponse
+
 # Load environment variables
 load_dotenv()
 
@@ -25,7 +27,8 @@ app = FastAPI(
     title="Digital Twin Platform",
     description="A platform that creates a true digital twin of you",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -4,6 +4,7 @@ import numpy as np
 import pytesseract
 from PIL import Image, ImageGrab
 import asyncio
+from contextlib import nullcontext
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 import hashlib
@@ -23,28 +24,40 @@ class ScreenCaptureService:
         self.capture_interval = 30  # seconds
         self.is_capturing = False
         
-    async def start_capture_loop(self, user_id: str, analyze_callback=None):
-        """Start continuous screen capture loop"""
+    async def start_capture_loop(self, user_id: str, analyze_callback=None, session_factory=None):
+        """Start continuous screen capture loop
+        
+        When a session_factory is given, a single session is opened for the
+        whole capture session and passed to the callback on every tick.
+        """
         self.is_capturing = True
         
-        while self.is_capturing:
-            try:
-                # Capture screen
-                screenshot = self.capture_screen()
-                
-                # Analyze the screenshot
-                analysis = await self.analyze_screenshot(screenshot, user_id)
-                
-                # Call the callback if provided
-                if analyze_callback:
-                    await analyze_callback(user_id, analysis)
-                
-                # Wait for next capture
-                await asyncio.sleep(self.capture_interval)
-                
-            except Exception as e:
-                logger.error(f"Error in screen capture loop: {str(e)}")
-                await asyncio.sleep(self.capture_interval)
+        session_context = session_factory() if session_factory else nullcontext()
+        async with session_context as db:
+            while self.is_capturing:
+                try:
+                    # Capture screen
+                    screenshot = self.capture_screen()
+                    
+                    # Analyze the screenshot
+                    analysis = await self.analyze_screenshot(screenshot, user_id)
+                    
+                    # Call the callback if provided
+                    if analyze_callback:
+                        if db is not None:
+                            await analyze_callback(user_id, analysis, db)
+                        else:
+                            await analyze_callback(user_id, analysis)
+                    
+                    # Wait for next capture
+                    await asyncio.sleep(self.capture_interval)
+                    
+                except Exception as e:
+                    logger.error(f"Error in screen capture loop: {str(e)}")
+                    if db is not None:
+                        # Keep the shared session usable for the next tick
+                        await db.rollback()
+                    await asyncio.sleep(self.capture_interval)
     
     def stop_capture(self):
         """Stop the capture loop"""